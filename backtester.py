@@ -4,6 +4,239 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import json
+import os
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from numba import njit, prange
+
+# Trade simulation limits (in candles)
+MAX_FILL_BARS = 60
+MAX_HOLD_BARS = 200
+
+# Candles scanned between progress updates
+PROGRESS_CHUNK_BARS = 5000
+
+# Outcome codes returned by the simulation kernel
+OUTCOME_EXPIRED = 0
+OUTCOME_WIN = 1
+OUTCOME_LOSS = 2
+OUTCOME_TIMEOUT = 3
+
+# Quality-score lookup tables, indexed by the number of thresholds reached
+# Risk multiplier buckets: <75, >=75, >=85, >=90
+RISK_MULTIPLIERS = np.array([1.0, 1.1, 1.3, 1.5])
+# R:R buckets: <75, >=75, >=90
+RR_RATIOS = np.array([2.0, 2.5, 3.0])
+
+# Columnar (structure-of-arrays) trade log layout
+TRADE_CHUNK_SIZE = 1024
+TRADE_COLUMNS = {
+    'date': np.int64,           # Signal candle time, epoch seconds
+    'direction': np.int8,       # 1 = bullish, -1 = bearish
+    'entry': np.float64,
+    'sl': np.float64,
+    'tp': np.float64,
+    'quality_score': np.int64,
+    'quality': np.int8,         # Index into QUALITY_LABELS
+    'rr_ratio': np.float64,
+    'outcome': np.int8,         # OUTCOME_* code
+    'pnl': np.float64,
+    'pips': np.float64,
+    'bars_to_fill': np.int64,
+    'bars_held': np.int64,
+    'exit_price': np.float64
+}
+QUALITY_LABELS = ('POOR', 'FAIR', 'GOOD', 'EXCELLENT')   # Buckets: <60, >=60, >=75, >=90
+OUTCOME_LABELS = ('expired', 'win', 'loss', 'timeout')
+
+# Score points used by the signal scan kernel
+CONFLUENCE_POINTS = (0, 15, 20, 25)     # Indexed by confluence quality code + 1
+
+
+@njit(cache=True)
+def _simulate_trade_nb(high, low, signal_index, is_bullish, entry, sl, tp, max_lookback, max_hold):
+    """
+    Numba kernel for the limit-order fill and SL/TP search.
+    
+    Returns:
+        Tuple: (outcome_code, fill_index, exit_index, exit_price)
+    """
+    n = high.shape[0]
+    fill_index = -1
+    
+    # Single pass: wait for the limit fill, then track SL/TP from the fill candle onward
+    for i in range(signal_index, min(signal_index + max_lookback + max_hold, n)):
+        if fill_index < 0:
+            if i - signal_index >= max_lookback:
+                return OUTCOME_EXPIRED, -1, -1, 0.0
+            
+            if is_bullish:
+                if low[i] <= entry:
+                    fill_index = i
+            else:
+                if high[i] >= entry:
+                    fill_index = i
+            
+            if fill_index < 0:
+                continue
+        elif i - fill_index >= max_hold:
+            break
+        
+        # SL is checked before TP on the same candle
+        if is_bullish:
+            if low[i] <= sl:
+                return OUTCOME_LOSS, fill_index, i, sl
+            if high[i] >= tp:
+                return OUTCOME_WIN, fill_index, i, tp
+        else:
+            if high[i] >= sl:
+                return OUTCOME_LOSS, fill_index, i, sl
+            if low[i] <= tp:
+                return OUTCOME_WIN, fill_index, i, tp
+    
+    if fill_index < 0:
+        return OUTCOME_EXPIRED, -1, -1, 0.0
+    
+    return OUTCOME_TIMEOUT, fill_index, -1, 0.0
+
+
+@njit(parallel=True, cache=True)
+def _simulate_all_nb(high, low, signal_idx, is_bull, entry, sl, tp, max_lookback, max_hold):
+    """
+    Run the simulation kernel for every signal in parallel.
+    
+    Returns:
+        Tuple of arrays: (outcome_code, fill_index, exit_index, exit_price)
+    """
+    n = signal_idx.shape[0]
+    outcome_code = np.empty(n, dtype=np.int64)
+    fill_index = np.empty(n, dtype=np.int64)
+    exit_index = np.empty(n, dtype=np.int64)
+    exit_price = np.empty(n, dtype=np.float64)
+    
+    for k in prange(n):
+        o, f, e, p = _simulate_trade_nb(high, low, signal_idx[k], is_bull[k], entry[k],
+                                        sl[k], tp[k], max_lookback, max_hold)
+        outcome_code[k] = o
+        fill_index[k] = f
+        exit_index[k] = e
+        exit_price[k] = p
+    
+    return outcome_code, fill_index, exit_index, exit_price
+
+
+@njit(cache=True)
+def _scan_signals_nb(high, low, open_, close, last_swing_high, last_swing_low,
+                     last_bearish, last_bullish, fvg_type, fvg_high, fvg_low,
+                     start, end, min_quality, min_confluence, require_confluence):
+    """
+    Numba kernel for the signal scan over candles [start, end): MSS, Order Block,
+    FVG, confluence, quality score, entry and TP for every candle.
+    
+    Returns:
+        Tuple: (signals_found, signal_index, direction, entry, sl, tp, score, rr_ratio),
+        all but signals_found trimmed to the number of accepted signals
+    """
+    size = max(end - start, 0)
+    signal_index = np.empty(size, dtype=np.int64)
+    direction = np.empty(size, dtype=np.int8)
+    entries = np.empty(size, dtype=np.float64)
+    sls = np.empty(size, dtype=np.float64)
+    tps = np.empty(size, dtype=np.float64)
+    scores = np.empty(size, dtype=np.int64)
+    rr_ratios = np.empty(size, dtype=np.float64)
+    
+    signals_found = 0
+    k = 0
+    
+    for i in range(start, end):
+        # MSS: close of candle i-1 beyond the latest swing inside the 20-candle window;
+        # the window edges can never be swings, so the latest usable one sits at or before i-2
+        if i < 3:
+            continue
+        
+        window_start = i - min(20, i)
+        swing_high_idx = last_swing_high[i - 2]
+        swing_low_idx = last_swing_low[i - 2]
+        
+        if swing_high_idx <= window_start or swing_low_idx <= window_start:
+            continue
+        
+        current_close = close[i - 1]
+        if current_close > high[swing_high_idx]:
+            mss = 1
+            sl = low[i - 1]
+        elif current_close < low[swing_low_idx]:
+            mss = -1
+            sl = high[i - 1]
+        else:
+            continue
+        
+        signals_found += 1
+        
+        # Order Block: last opposing candle in [i - 20, i)
+        ob_type = 0
+        ob_high = ob_low = body_high = body_low = 0.0
+        if i >= 20:
+            j = last_bearish[i - 1] if mss == 1 else last_bullish[i - 1]
+            if j >= i - 20:
+                ob_type = mss
+                ob_high = high[j]
+                ob_low = low[j]
+                body_high = max(open_[j], close[j])
+                body_low = min(open_[j], close[j])
+        
+        fvg = fvg_type[i]
+        
+        # Confluence: 2 = high, 1 = medium, 0 = low, -1 = none
+        confluence_code = -1
+        if ob_type != 0 and fvg != 0 and ob_type == fvg:
+            overlap_high = min(ob_high, fvg_high[i])
+            overlap_low = max(ob_low, fvg_low[i])
+            
+            if overlap_low < overlap_high:
+                fvg_size = fvg_high[i] - fvg_low[i]
+                overlap_pct = ((overlap_high - overlap_low) / fvg_size * 100) if fvg_size > 0 else 0.0
+                
+                if overlap_pct >= min_confluence:
+                    confluence_code = 2 if overlap_pct >= 70 else 1 if overlap_pct >= 50 else 0
+        
+        if require_confluence and confluence_code < 0:
+            continue
+        
+        # Quality check (MSS is always present here)
+        score = 25 + 25 * (ob_type != 0) + 25 * (fvg != 0) + CONFLUENCE_POINTS[confluence_code + 1]
+        
+        if score < min_quality:
+            continue
+        
+        # Entry: overlap midpoint on high confluence, otherwise the OB body edge
+        if confluence_code == 2:
+            entry = (min(ob_high, fvg_high[i]) + max(ob_low, fvg_low[i])) / 2
+        elif ob_type != 0:
+            entry = body_low if ob_type == 1 else body_high
+        else:
+            continue
+        
+        if entry == 0.0:
+            continue
+        
+        # TP from the quality-bucketed R:R
+        rr_ratio = RR_RATIOS[(score >= 75) + (score >= 90)]
+        risk = abs(entry - sl)
+        
+        signal_index[k] = i
+        direction[k] = mss
+        entries[k] = entry
+        sls[k] = sl
+        tps[k] = entry + risk * rr_ratio if mss == 1 else entry - risk * rr_ratio
+        scores[k] = score
+        rr_ratios[k] = rr_ratio
+        k += 1
+    
+    return (signals_found, signal_index[:k], direction[:k], entries[:k], sls[:k],
+            tps[:k], scores[:k], rr_ratios[:k])
+
 
 class Backtester:
     """
@@ -11,7 +244,7 @@ class Backtester:
     Validates strategy parameters and provides performance metrics.
     """
     
-    def __init__(self, symbol, initial_balance=10000, risk_per_trade=0.005):
+    def __init__(self, symbol, initial_balance=10000, risk_per_trade=0.005, cache_dir=".cache"):
         """
         Initialize Backtester.
         
@@ -19,16 +252,76 @@ class Backtester:
             symbol: Trading symbol (e.g., "EURUSD")
             initial_balance: Starting capital
             risk_per_trade: Base risk per trade as decimal
+            cache_dir: Directory for cached historical data (None to disable)
         """
         self.symbol = symbol
         self.initial_balance = initial_balance
         self.current_balance = initial_balance
         self.risk_per_trade = risk_per_trade
+        self.cache_dir = cache_dir
         
-        self.trades = []
-        self.equity_curve = []
+        self._reset_trades()
+        self._reset_equity()
         self.daily_returns = []
         
+        # Warm up the simulation kernel so the first backtest doesn't pay the JIT cost
+        _dummy = np.zeros(2, dtype=np.float64)
+        _simulate_trade_nb(_dummy, _dummy, 0, True, 1.0, 0.5, 1.5, MAX_FILL_BARS, MAX_HOLD_BARS)
+        _simulate_all_nb(_dummy, _dummy, np.zeros(1, dtype=np.int64), np.ones(1, dtype=np.bool_),
+                         _dummy[:1], _dummy[:1], _dummy[:1], MAX_FILL_BARS, MAX_HOLD_BARS)
+        
+    def _reset_trades(self):
+        """Clear the columnar trade log."""
+        self._trade_cols = {name: np.empty(TRADE_CHUNK_SIZE, dtype=dtype)
+                            for name, dtype in TRADE_COLUMNS.items()}
+        self._n_trades = 0
+    
+    def _append_trade(self, **values):
+        """Append one trade to the columnar log, growing it in fixed-size chunks."""
+        k = self._n_trades
+        if k == len(self._trade_cols['pnl']):
+            for name, col in self._trade_cols.items():
+                self._trade_cols[name] = np.resize(col, k + TRADE_CHUNK_SIZE)
+        
+        for name, value in values.items():
+            self._trade_cols[name][k] = value
+        self._n_trades = k + 1
+    
+    def _reset_equity(self):
+        """Reset the preallocated equity curve to the initial balance."""
+        self._equity = np.empty(TRADE_CHUNK_SIZE, dtype=np.float64)
+        self._equity[0] = self.initial_balance
+        self._eq_n = 1
+    
+    def _append_equity(self, balance):
+        """Append a balance point, doubling the buffer when full."""
+        if self._eq_n == self._equity.size:
+            self._equity = np.resize(self._equity, 2 * self._eq_n)
+        self._equity[self._eq_n] = balance
+        self._eq_n += 1
+    
+    @property
+    def equity_curve(self):
+        """Equity curve as a float64 array view over the filled part of the buffer."""
+        return self._equity[:self._eq_n]
+    
+    @property
+    def trades(self):
+        """Trade log as a list of dictionaries (built on demand for reporting/export)."""
+        cols = {name: col[:self._n_trades].tolist() for name, col in self._trade_cols.items()}
+        # Epoch seconds -> datetime in one vectorised conversion
+        cols['date'] = self._trade_cols['date'][:self._n_trades].astype('datetime64[s]').tolist()
+        trades = []
+        
+        for k in range(self._n_trades):
+            trade = {name: cols[name][k] for name in TRADE_COLUMNS}
+            trade['direction'] = 'bullish' if trade['direction'] == 1 else 'bearish'
+            trade['quality'] = QUALITY_LABELS[trade['quality']]
+            trade['outcome'] = OUTCOME_LABELS[trade['outcome']]
+            trades.append(trade)
+        
+        return trades
+    
     def fetch_historical_data(self, start_date, end_date, timeframe=mt5.TIMEFRAME_M1):
         """
         Fetch historical OHLC data from MT5.
@@ -41,16 +334,49 @@ class Backtester:
         Returns:
             DataFrame with OHLC data
         """
+        rates = self.fetch_historical_data_np(start_date, end_date, timeframe)
+        
+        df = pd.DataFrame(rates)
+        df['time'] = pd.to_datetime(df['time'], unit='s')
+        return df
+    
+    def fetch_historical_data_np(self, start_date, end_date, timeframe=mt5.TIMEFRAME_M1):
+        """
+        Fetch historical OHLC data from MT5 as the raw structured numpy array.
+        
+        Args:
+            start_date: Start date (datetime object)
+            end_date: End date (datetime object)
+            timeframe: MT5 timeframe constant
+        
+        Returns:
+            Structured ndarray with time/open/high/low/close/tick_volume fields
+        """
+        # Only cache closed ranges; recent intraday data may still change
+        cache_path = None
+        if self.cache_dir and end_date <= datetime.now() - timedelta(minutes=5):
+            key = f"{self.symbol}_{timeframe}_{start_date:%Y%m%d%H%M}_{end_date:%Y%m%d%H%M}.npy"
+            cache_path = Path(self.cache_dir) / key
+            
+            if cache_path.exists():
+                rates = np.load(cache_path)
+                print(f"✅ Loaded {len(rates)} cached candles from {cache_path}")
+                return rates
+        
         rates = mt5.copy_rates_range(self.symbol, timeframe, start_date, end_date)
         
         if rates is None or len(rates) == 0:
             raise Exception(f"Failed to fetch historical data for {self.symbol}")
         
-        df = pd.DataFrame(rates)
-        df['time'] = pd.to_datetime(df['time'], unit='s')
+        if cache_path:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                np.save(cache_path, rates)
+            except Exception as e:
+                print(f"⚠️  Failed to cache historical data: {e}")
         
-        print(f"✅ Fetched {len(df)} candles from {start_date} to {end_date}")
-        return df
+        print(f"✅ Fetched {len(rates)} candles from {start_date} to {end_date}")
+        return rates
     
     def detect_mss(self, df, index):
         """Detect MSS at a specific candle index."""
@@ -59,29 +385,34 @@ class Backtester:
         
         # Look at last 20 candles for swing points
         lookback = min(20, index)
-        window = df.iloc[max(0, index-lookback):index]
+        start = max(0, index - lookback)
         
-        window = window.copy()
-        window['swing_high'] = (window['high'] > window['high'].shift(1)) & \
-                                (window['high'] > window['high'].shift(-1))
-        window['swing_low'] = (window['low'] < window['low'].shift(1)) & \
-                               (window['low'] < window['low'].shift(-1))
+        h = df['high'].values
+        l = df['low'].values
+        w_hi = h[start:index]
+        w_lo = l[start:index]
         
-        current_candle = df.iloc[index-1]
+        # Window edges are never swings (no neighbour on one side)
+        sh = np.zeros(len(w_hi), dtype=bool)
+        sl = np.zeros(len(w_lo), dtype=bool)
+        sh[1:-1] = (w_hi[1:-1] > w_hi[:-2]) & (w_hi[1:-1] > w_hi[2:])
+        sl[1:-1] = (w_lo[1:-1] < w_lo[:-2]) & (w_lo[1:-1] < w_lo[2:])
         
-        swing_highs = window[window['swing_high']]
-        swing_lows = window[window['swing_low']]
+        swing_highs = sh.nonzero()[0]
+        swing_lows = sl.nonzero()[0]
         
-        if swing_highs.empty or swing_lows.empty:
+        if swing_highs.size == 0 or swing_lows.size == 0:
             return None, None
         
-        last_swing_high = swing_highs.iloc[-1]['high']
-        last_swing_low = swing_lows.iloc[-1]['low']
+        last_swing_high = w_hi[swing_highs[-1]]
+        last_swing_low = w_lo[swing_lows[-1]]
+        
+        current_close = df['close'].values[index - 1]
         
-        if current_candle['close'] > last_swing_high:
-            return "bullish", current_candle['low']
-        elif current_candle['close'] < last_swing_low:
-            return "bearish", current_candle['high']
+        if current_close > last_swing_high:
+            return "bullish", l[index - 1]
+        elif current_close < last_swing_low:
+            return "bearish", h[index - 1]
         
         return None, None
     
@@ -133,6 +464,69 @@ class Backtester:
         
         return None
     
+    def _precompute_arrays(self, rates):
+        """
+        Extract raw OHLC arrays and precompute whole-series SMC masks.
+        
+        Args:
+            rates: Structured ndarray from fetch_historical_data_np()
+        
+        Returns:
+            Dictionary of numpy arrays used by the vectorized scan helpers
+        """
+        # Structured-array fields are strided views; make them contiguous once for the kernels
+        high = np.ascontiguousarray(rates['high'], dtype=np.float64)
+        low = np.ascontiguousarray(rates['low'], dtype=np.float64)
+        open_ = np.ascontiguousarray(rates['open'], dtype=np.float64)
+        close = np.ascontiguousarray(rates['close'], dtype=np.float64)
+        
+        n = len(high)
+        
+        # Swing points (n=1) in a single pass; the series edges can never be swings
+        swing_high = np.zeros(n, dtype=bool)
+        swing_low = np.zeros(n, dtype=bool)
+        swing_high[1:-1] = (high[1:-1] > high[:-2]) & (high[1:-1] > high[2:])
+        swing_low[1:-1] = (low[1:-1] < low[:-2]) & (low[1:-1] < low[2:])
+        
+        # Index of the most recent swing at or before each candle (-1 if none yet)
+        candle_idx = np.arange(n)
+        last_swing_high = np.maximum.accumulate(np.where(swing_high, candle_idx, -1))
+        last_swing_low = np.maximum.accumulate(np.where(swing_low, candle_idx, -1))
+        
+        # Index of the most recent bearish / bullish candle at or before each candle (Order Block candidates)
+        last_bearish = np.maximum.accumulate(np.where(close < open_, candle_idx, -1))
+        last_bullish = np.maximum.accumulate(np.where(close > open_, candle_idx, -1))
+        
+        # FVG per signal index i, using candles i-4 (c1) and i-2 (c3):
+        # 1 = bullish (c3 low > c1 high), -1 = bearish (c3 high < c1 low), 0 = none
+        fvg_type = np.zeros(n, dtype=np.int8)
+        fvg_high = np.zeros(n, dtype=np.float64)
+        fvg_low = np.zeros(n, dtype=np.float64)
+        
+        c1_high, c1_low = high[:-4], low[:-4]
+        c3_high, c3_low = high[2:-2], low[2:-2]
+        bull = c3_low > c1_high
+        bear = c3_high < c1_low
+        
+        fvg_type[4:] = np.where(bull, 1, np.where(bear, -1, 0))
+        fvg_high[4:] = np.where(bull, c3_low, c1_low)
+        fvg_low[4:] = np.where(bull, c1_high, c3_high)
+        
+        return {
+            'high': high,
+            'low': low,
+            'open': open_,
+            'close': close,
+            'time': np.ascontiguousarray(rates['time'], dtype=np.int64),  # Epoch seconds
+            'last_swing_high': last_swing_high,
+            'last_swing_low': last_swing_low,
+            'last_bearish': last_bearish,
+            'last_bullish': last_bullish,
+            'fvg_type': fvg_type,
+            'fvg_high': fvg_high,
+            'fvg_low': fvg_low
+        }
+    
     def check_confluence(self, ob, fvg, min_overlap=40):
         """Check OB and FVG confluence."""
         if not ob or not fvg or ob['type'] != fvg['type']:
@@ -192,19 +586,45 @@ class Backtester:
         
         return None
     
-    def simulate_trade(self, df, signal_index, mss_type, entry, sl, tp, quality_score):
+    def simulate_trade(self, high, low, signal_index, mss_type, entry, sl, tp, quality_score):
         """
         Simulate a trade execution and outcome.
         
+        Args:
+            high: numpy array of candle highs
+            low: numpy array of candle lows
+            signal_index: Index of the signal candle
+            mss_type: "bullish" or "bearish"
+            entry, sl, tp: Limit entry, stop loss and take profit prices
+            quality_score: Setup quality score used for risk sizing
+        
         Returns:
             Trade outcome dictionary
         """
+        # Look 60 candles ahead for the fill (1 hour on M1), then hold up to 200 candles (3+ hours)
+        outcome_code, fill_index, exit_index, exit_price = _simulate_trade_nb(
+            high, low, signal_index, mss_type == "bullish", entry, sl, tp,
+            MAX_FILL_BARS, MAX_HOLD_BARS
+        )
+        
+        return self._build_trade_result(outcome_code, fill_index, exit_index, exit_price,
+                                        signal_index, abs(entry - sl), abs(tp - entry), quality_score)
+    
+    def _build_trade_result(self, outcome_code, fill_index, exit_index, exit_price,
+                            signal_index, sl_distance, tp_distance, quality_score):
+        """
+        Convert a simulation kernel result into a trade outcome dictionary.
+        Risk is sized from the current balance, so calls must be made in signal order.
+        
+        Args:
+            sl_distance: abs(entry - sl), precomputed by the caller
+            tp_distance: abs(tp - entry), precomputed by the caller
+        """
         # Risk management
-        risk_multiplier = 1.5 if quality_score >= 90 else 1.3 if quality_score >= 85 else 1.1 if quality_score >= 75 else 1.0
+        risk_multiplier = RISK_MULTIPLIERS[(quality_score >= 75) + (quality_score >= 85) + (quality_score >= 90)]
         adjusted_risk = self.risk_per_trade * risk_multiplier
         
         risk_amount = self.current_balance * adjusted_risk
-        sl_distance = abs(entry - sl)
 
         # Prevent division by zero or invalid SL distance
         point = 0.0001  # For EURUSD
@@ -219,27 +639,7 @@ class Backtester:
         # Calculate lot size (simplified)
         lot_size = risk_amount / (sl_distance / point * 10)  # Simplified calculation
         
-        # Look ahead to see if order would be filled
-        max_lookback = 60  # Look 60 candles ahead (1 hour on M1)
-        filled = False
-        fill_index = None
-        
-        for i in range(signal_index, min(signal_index + max_lookback, len(df))):
-            candle = df.iloc[i]
-            
-            # Check if limit order would be filled
-            if mss_type == "bullish":
-                if candle['low'] <= entry:
-                    filled = True
-                    fill_index = i
-                    break
-            else:
-                if candle['high'] >= entry:
-                    filled = True
-                    fill_index = i
-                    break
-        
-        if not filled:
+        if outcome_code == OUTCOME_EXPIRED:
             return {
                 'outcome': 'expired',
                 'pnl': 0,
@@ -247,67 +647,33 @@ class Backtester:
                 'bars_to_fill': None
             }
         
-        # Simulate trade progression
         bars_to_fill = fill_index - signal_index
         
-        for i in range(fill_index, min(fill_index + 200, len(df))):  # Max 200 candles (3+ hours)
-            candle = df.iloc[i]
-            
-            # Check if SL hit
-            if mss_type == "bullish":
-                if candle['low'] <= sl:
-                    pnl = -risk_amount
-                    pips = -abs(entry - sl) * 10000
-                    return {
-                        'outcome': 'loss',
-                        'pnl': pnl,
-                        'pips': pips,
-                        'bars_to_fill': bars_to_fill,
-                        'bars_held': i - fill_index,
-                        'exit_price': sl
-                    }
-                # Check if TP hit
-                if candle['high'] >= tp:
-                    pnl = abs(tp - entry) / abs(entry - sl) * risk_amount
-                    pips = abs(tp - entry) * 10000
-                    return {
-                        'outcome': 'win',
-                        'pnl': pnl,
-                        'pips': pips,
-                        'bars_to_fill': bars_to_fill,
-                        'bars_held': i - fill_index,
-                        'exit_price': tp
-                    }
-            else:
-                if candle['high'] >= sl:
-                    pnl = -risk_amount
-                    pips = -abs(sl - entry) * 10000
-                    return {
-                        'outcome': 'loss',
-                        'pnl': pnl,
-                        'pips': pips,
-                        'bars_to_fill': bars_to_fill,
-                        'bars_held': i - fill_index,
-                        'exit_price': sl
-                    }
-                if candle['low'] <= tp:
-                    pnl = abs(entry - tp) / abs(sl - entry) * risk_amount
-                    pips = abs(entry - tp) * 10000
-                    return {
-                        'outcome': 'win',
-                        'pnl': pnl,
-                        'pips': pips,
-                        'bars_to_fill': bars_to_fill,
-                        'bars_held': i - fill_index,
-                        'exit_price': tp
-                    }
-        
-        # Trade didn't hit SL or TP within time limit
+        if outcome_code == OUTCOME_TIMEOUT:
+            # Trade didn't hit SL or TP within time limit
+            return {
+                'outcome': 'timeout',
+                'pnl': 0,
+                'pips': 0,
+                'bars_to_fill': bars_to_fill
+            }
+        
+        if outcome_code == OUTCOME_LOSS:
+            pnl = -risk_amount
+            pips = -sl_distance * 10000
+            outcome = 'loss'
+        else:
+            pnl = tp_distance / sl_distance * risk_amount
+            pips = tp_distance * 10000
+            outcome = 'win'
+        
         return {
-            'outcome': 'timeout',
-            'pnl': 0,
-            'pips': 0,
-            'bars_to_fill': bars_to_fill
+            'outcome': outcome,
+            'pnl': pnl,
+            'pips': pips,
+            'bars_to_fill': bars_to_fill,
+            'bars_held': exit_index - fill_index,
+            'exit_price': exit_price
         }
     
     def run_backtest(self, start_date, end_date, config=None):
@@ -330,8 +696,9 @@ class Backtester:
         print(f"Initial Balance: ${self.initial_balance:,.2f}")
         print(f"{'='*70}\n")
         
-        # Fetch data
-        df = self.fetch_historical_data(start_date, end_date)
+        # Fetch data once; everything below works on the cached raw arrays
+        rates = self.fetch_historical_data_np(start_date, end_date)
+        arrs = self._precompute_arrays(rates)
         
         # Config
         min_quality = config.get('min_quality', 70) if config else 70
@@ -340,79 +707,81 @@ class Backtester:
         
         # Reset state
         self.current_balance = self.initial_balance
-        self.trades = []
-        self.equity_curve = [self.initial_balance]
+        self._reset_trades()
+        self._reset_equity()
         
         signals_found = 0
         trades_taken = 0
         
-        # Scan through data
-        for i in range(50, len(df) - 200):  # Need buffer on both sides
-            # Detect MSS
-            mss_type, sl = self.detect_mss(df, i)
+        # Phase 1: scan through data and collect candidate signals
+        n_candles = len(arrs['close'])
+        scan_start, scan_end = 50, n_candles - 200  # Need buffer on both sides
+        scan_args = (arrs['high'], arrs['low'], arrs['open'], arrs['close'],
+                     arrs['last_swing_high'], arrs['last_swing_low'],
+                     arrs['last_bearish'], arrs['last_bullish'],
+                     arrs['fvg_type'], arrs['fvg_high'], arrs['fvg_low'])
+        chunks = []
+        n_signals = 0
+        
+        # Scan in fixed-size chunks and report progress between them, not per candle
+        for chunk_start in range(scan_start, scan_end, PROGRESS_CHUNK_BARS):
+            chunk_end = min(chunk_start + PROGRESS_CHUNK_BARS, scan_end)
             
-            if not mss_type:
-                continue
+            found, *chunk = _scan_signals_nb(*scan_args, chunk_start, chunk_end,
+                                             min_quality, min_confluence, require_confluence)
+            signals_found += found
+            n_signals += len(chunk[0])
+            chunks.append(chunk)
             
-            signals_found += 1
-            
-            # Find OB and FVG
-            ob = self.find_order_block(df, i, mss_type)
-            fvg = self.find_fvg(df, i)
-            
-            # Check confluence
-            confluence = self.check_confluence(ob, fvg, min_confluence)
-            
-            if require_confluence and not confluence:
-                continue
-            
-            # Quality check
-            quality = self.calculate_setup_quality(mss_type, ob, fvg, confluence)
-            
-            if quality['score'] < min_quality:
-                continue
-            
-            # Get entry
-            entry = self.get_entry_price(ob, fvg, confluence)
-            if not entry:
-                continue
-            
-            # Calculate TP
-            risk = abs(entry - sl)
-            rr_ratio = 3.0 if quality['score'] >= 90 else 2.5 if quality['score'] >= 75 else 2.0
-            
-            if mss_type == "bullish":
-                tp = entry + (risk * rr_ratio)
-            else:
-                tp = entry - (risk * rr_ratio)
-            
-            # Simulate trade
-            result = self.simulate_trade(df, i, mss_type, entry, sl, tp, quality['score'])
+            print(f"Progress: {chunk_end}/{n_candles} candles | Signals: {n_signals}")
+        
+        if chunks:
+            signal_idx, directions, entries, sls, tps, scores, rr_ratios = (np.concatenate(col) for col in zip(*chunks))
+        else:
+            signal_idx, directions, entries, sls, tps, scores, rr_ratios = _scan_signals_nb(
+                *scan_args, 0, 0, min_quality, min_confluence, require_confluence)[1:]
+        
+        # Phase 2: simulate every signal in parallel (the fill/SL/TP search is stateless)
+        outcomes, fill_idx, exit_idx, exit_prices = _simulate_all_nb(
+            arrs['high'], arrs['low'], signal_idx, directions == 1, entries, sls, tps,
+            MAX_FILL_BARS, MAX_HOLD_BARS
+        )
+        
+        # Loop-invariant distances for every signal, computed once
+        sl_distances = np.abs(entries - sls)
+        tp_distances = np.abs(tps - entries)
+        
+        # Phase 3: serial accounting pass, since risk depends on the running balance
+        for k in range(len(signal_idx)):
+            # Plain ints: summed numpy bools would OR together in the bucket lookups
+            i, score = int(signal_idx[k]), int(scores[k])
+            result = self._build_trade_result(outcomes[k], fill_idx[k], exit_idx[k], exit_prices[k],
+                                              i, sl_distances[k], tp_distances[k], score)
             
             if result['outcome'] in ['win', 'loss']:
                 trades_taken += 1
                 
                 # Update balance
                 self.current_balance += result['pnl']
-                self.equity_curve.append(self.current_balance)
+                self._append_equity(self.current_balance)
                 
                 # Record trade
-                trade_record = {
-                    'date': df.iloc[i]['time'],
-                    'direction': mss_type,
-                    'entry': entry,
-                    'sl': sl,
-                    'tp': tp,
-                    'quality_score': quality['score'],
-                    'quality': quality['quality'],
-                    'rr_ratio': rr_ratio,
-                    **result
-                }
-                self.trades.append(trade_record)
-            
-            # Progress update every 1000 candles
-            if i % 1000 == 0:
-                print(f"Progress: {i}/{len(df)} candles | Balance: ${self.current_balance:,.2f}")
+                self._append_trade(
+                    date=arrs['time'][i],
+                    direction=directions[k],
+                    entry=entries[k],
+                    sl=sls[k],
+                    tp=tps[k],
+                    quality_score=score,
+                    quality=(score >= 60) + (score >= 75) + (score >= 90),
+                    rr_ratio=rr_ratios[k],
+                    outcome=OUTCOME_WIN if result['outcome'] == 'win' else OUTCOME_LOSS,
+                    pnl=result['pnl'],
+                    pips=result['pips'],
+                    bars_to_fill=result['bars_to_fill'],
+                    bars_held=result['bars_held'],
+                    exit_price=result['exit_price']
+                )
         
         # Calculate metrics
         results = self.calculate_metrics()
@@ -423,47 +792,51 @@ class Backtester:
     
     def calculate_metrics(self):
         """Calculate comprehensive backtest metrics."""
-        if not self.trades:
+        if self._n_trades == 0:
             return {'error': 'No trades taken'}
         
-        df_trades = pd.DataFrame(self.trades)
+        # Basic stats (reduced directly on the columnar trade log)
+        total_trades = self._n_trades
+        pnl = self._trade_cols['pnl'][:total_trades]
+        outcomes = self._trade_cols['outcome'][:total_trades]
+        quality_scores = self._trade_cols['quality_score'][:total_trades]
+        rr_ratios = self._trade_cols['rr_ratio'][:total_trades]
         
-        # Basic stats
-        total_trades = len(df_trades)
-        wins = df_trades[df_trades['outcome'] == 'win']
-        losses = df_trades[df_trades['outcome'] == 'loss']
+        # Per-outcome trade counts and P&L sums, one pass each
+        counts = np.bincount(outcomes, minlength=len(OUTCOME_LABELS))
+        pnl_sums = np.bincount(outcomes, weights=pnl, minlength=len(OUTCOME_LABELS))
         
-        win_count = len(wins)
-        loss_count = len(losses)
+        win_count = int(counts[OUTCOME_WIN])
+        loss_count = int(counts[OUTCOME_LOSS])
         win_rate = (win_count / total_trades * 100) if total_trades > 0 else 0
         
         # P&L
-        total_pnl = df_trades['pnl'].sum()
+        total_pnl = pnl.sum()
         total_return_pct = ((self.current_balance - self.initial_balance) / self.initial_balance) * 100
         
         # Win/Loss stats
-        avg_win = wins['pnl'].mean() if len(wins) > 0 else 0
-        avg_loss = losses['pnl'].mean() if len(losses) > 0 else 0
-        best_trade = df_trades['pnl'].max()
-        worst_trade = df_trades['pnl'].min()
+        gross_profit = pnl_sums[OUTCOME_WIN] if win_count > 0 else 0
+        gross_loss = abs(pnl_sums[OUTCOME_LOSS]) if loss_count > 0 else 0
+        avg_win = gross_profit / win_count if win_count > 0 else 0
+        avg_loss = pnl_sums[OUTCOME_LOSS] / loss_count if loss_count > 0 else 0
+        best_trade = pnl.max()
+        worst_trade = pnl.min()
         
         # Profit factor
-        gross_profit = wins['pnl'].sum() if len(wins) > 0 else 0
-        gross_loss = abs(losses['pnl'].sum()) if len(losses) > 0 else 0
         profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0
         
         # Drawdown
-        equity = pd.Series(self.equity_curve)
-        running_max = equity.expanding().max()
-        drawdown = (equity - running_max) / running_max * 100
+        equity = self.equity_curve
+        running_max = np.maximum.accumulate(equity)
+        drawdown = (equity - running_max) / running_max * 100.0
         max_drawdown = drawdown.min()
         
         # Sharpe ratio (simplified)
-        returns = equity.pct_change().dropna()
-        sharpe = (returns.mean() / returns.std() * np.sqrt(252)) if len(returns) > 1 else 0
+        returns = np.diff(equity) / equity[:-1]
+        sharpe = (returns.mean() / returns.std(ddof=1) * np.sqrt(252)) if returns.size > 1 else 0
         
         # Quality score correlation
-        avg_quality_score = df_trades['quality_score'].mean()
+        avg_quality_score = quality_scores.mean()
         
         return {
             'total_trades': total_trades,
@@ -481,7 +854,7 @@ class Backtester:
             'max_drawdown_pct': max_drawdown,
             'sharpe_ratio': sharpe,
             'avg_quality_score': avg_quality_score,
-            'avg_rr_ratio': df_trades['rr_ratio'].mean()
+            'avg_rr_ratio': rr_ratios.mean()
         }
     
     def print_results(self, results):
@@ -536,7 +909,7 @@ class Backtester:
             },
             'results': results,
             'trades': self.trades,
-            'equity_curve': self.equity_curve
+            'equity_curve': self.equity_curve.tolist()
         }
         
         with open(filename, 'w') as f:
@@ -545,6 +918,52 @@ class Backtester:
         print(f"✅ Results exported to {filename}")
 
 
+def run_one(args):
+    """
+    Run a single backtest in a worker process.
+    
+    Args:
+        args: Tuple (symbol, start_date, end_date, config)
+    
+    Returns:
+        Tuple: (symbol, config, results)
+    """
+    symbol, start_date, end_date, config = args
+    
+    # MT5 sessions are process-local, so each worker opens its own
+    if not mt5.initialize():
+        return symbol, config, {'error': 'MT5 initialization failed'}
+    
+    try:
+        backtester = Backtester(symbol=symbol)
+        results = backtester.run_backtest(start_date, end_date, config)
+    finally:
+        mt5.shutdown()
+    
+    return symbol, config, results
+
+
+def run_backtests_parallel(tasks, max_workers=None):
+    """
+    Run symbol x config backtests across processes.
+    
+    Args:
+        tasks: List of (symbol, start_date, end_date, config) tuples
+        max_workers: Number of worker processes (default: CPU count)
+    
+    Returns:
+        List of (symbol, config, results) tuples in completion order
+    """
+    results = []
+    
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as ex:
+        futs = {ex.submit(run_one, task): task for task in tasks}
+        for fut in as_completed(futs):
+            results.append(fut.result())
+    
+    return results
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize MT5
@@ -1,123 +1,159 @@
-# -- Constants -- 
-SYMBOL = "EURUSD"
-RISK_PER_TRADE = 0.005 # 0.5% base risk (will be multiplied 0.5x-1.5x based on quality)
-MAGIC_NUMBER = 123456
-MAX_SPREAD_PIPS = 4.0  # Tighter spread requirement
-
-# -- Trading Session Times (UTC) --
-LONDON_SESSION_START = "08:00"
-LONDON_SESSION_END = "16:00"
-NEW_YORK_SESSION_START = "13:30"
-NEW_YORK_SESSION_END = "20:00"
-
-# -- Order Management Settings --
-MAX_ORDER_AGE_MINUTES = 20
-BREAKEVEN_TRIGGER_RR = 1.0
-ORDER_MANAGEMENT_CHECK_INTERVAL = 30
-
-# -- Order Block Settings --
-OB_LOOKBACK_CANDLES = 30
-MIN_CONFLUENCE_OVERLAP = 40
-REQUIRE_CONFLUENCE = True
-MIN_SETUP_QUALITY_SCORE = 70
-
-# -- Multi-Timeframe (MTF) Settings --
-ENABLE_MTF_CONFIRMATION = True
-MTF_TIMEFRAMES = ["M5", "M15"]
-REQUIRE_ALL_TF_ALIGNED = False
-MTF_MIN_ALIGNMENT_PCT = 50
-MTF_SCORE_BONUS = True
-
-# -- Breaker Block (BB) Settings --
-ENABLE_BREAKER_BLOCKS = True
-BB_LOOKBACK_CANDLES = 100
-BB_SCORE_BONUS = True
-BB_MIN_QUALITY = "medium"
-
-# -- Volume & Volatility Filters --
-MIN_VOLUME_RATIO = 0.6
-MIN_ATR_PIPS = 3.0
-MAX_ATR_PIPS = 20.0
-
-# -- Dynamic Risk Management --
-ENABLE_DYNAMIC_RISK = True
-MIN_RISK_MULTIPLIER = 0.5
-MAX_RISK_MULTIPLIER = 1.5
-
-# -- Dynamic Take Profit --
-ENABLE_DYNAMIC_TP = True
-MIN_RR_RATIO = 2.0
-MAX_RR_RATIO = 3.0
-
-# -- Telegram Notifications --
-ENABLE_TELEGRAM = True
-TELEGRAM_NOTIFY_SIGNALS = True
-TELEGRAM_NOTIFY_TRADES = True
-TELEGRAM_NOTIFY_FILLS = True
-TELEGRAM_NOTIFY_BREAKEVEN = True
-TELEGRAM_NOTIFY_CLOSES = True
-TELEGRAM_NOTIFY_SKIPS = False
-TELEGRAM_DAILY_SUMMARY = True
-
-# ============================================================================
-# NEW: RISK MANAGEMENT SETTINGS
-# ============================================================================
-
-# -- Daily/Weekly Drawdown Protection --
-ENABLE_RISK_MANAGER = True
-MAX_DAILY_LOSS_PCT = 0.03  # Stop trading after 3% daily loss
-MAX_WEEKLY_LOSS_PCT = 0.05  # Stop trading after 5% weekly loss
-MAX_DAILY_TRADES = 20  # Maximum trades per day
-
-# -- Risk State File --
-RISK_STATE_FILE = "risk_state.json"
-
-# ============================================================================
-# NEW: NEWS CALENDAR SETTINGS
-# ============================================================================
-
-# -- News Avoidance --
-AVOID_HIGH_IMPACT_NEWS = True
-NEWS_BUFFER_MINUTES = 30  # Minutes before/after news to avoid trading
-NEWS_CACHE_FILE = "news_cache.json"
-
-# -- News Calendar Source --
-# Options: 'forexfactory' (requires scraping), 'manual' (fallback)
-NEWS_SOURCE = 'forexfactory'
-
-# -- Manual News Times (UTC) - Fallback if API fails --
-MANUAL_NEWS_TIMES = [
-    ("08:30", "09:00"),   # EUR economic data
-    ("12:30", "13:30"),   # US economic data (NFP, CPI, etc.)
-    ("14:00", "16:00"),   # FOMC meetings/minutes
-]
-
-# ============================================================================
-# NEW: TRADE LOGGING SETTINGS
-# ============================================================================
-
-# -- Database Logging --
-ENABLE_TRADE_LOGGING = True
-TRADE_DB_PATH = "trades.db"
-
-# -- Performance Reporting --
-AUTO_CALCULATE_DAILY_PERFORMANCE = True
-PERFORMANCE_REPORT_DAYS = 7  # Days to include in reports
-
-# -- CSV Export --
-AUTO_EXPORT_CSV = False  # Set to True to auto-export trades daily
-CSV_EXPORT_PATH = "trades_export.csv"
+import os
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Bot settings. Read them through the CFG instance (CFG.SYMBOL, ...);
+    list-valued settings are tuples so the instance stays immutable.
+    """
+    # -- Constants -- 
+    SYMBOL: str = "EURUSD"
+    RISK_PER_TRADE: float = 0.005 # 0.5% base risk (will be multiplied 0.5x-1.5x based on quality)
+    MAGIC_NUMBER: int = 123456
+    MAX_SPREAD_PIPS: float = 4.0  # Tighter spread requirement
+    
+    # -- Trading Session Times (UTC) --
+    LONDON_SESSION_START: str = "08:00"
+    LONDON_SESSION_END: str = "16:00"
+    NEW_YORK_SESSION_START: str = "13:30"
+    NEW_YORK_SESSION_END: str = "20:00"
+    
+    # -- Order Management Settings --
+    MAX_ORDER_AGE_MINUTES: int = 20
+    BREAKEVEN_TRIGGER_RR: float = 1.0
+    ORDER_MANAGEMENT_CHECK_INTERVAL: int = 30
+    BAR_POLL_INTERVAL: float = 0.1  # Seconds between checks for a new closed M1 candle
+    
+    # -- Order Block Settings --
+    OB_LOOKBACK_CANDLES: int = 30
+    MIN_CONFLUENCE_OVERLAP: int = 40
+    REQUIRE_CONFLUENCE: bool = True
+    MIN_SETUP_QUALITY_SCORE: int = 70
+    
+    # -- Multi-Timeframe (MTF) Settings --
+    ENABLE_MTF_CONFIRMATION: bool = True
+    MTF_TIMEFRAMES: tuple = ("M5", "M15")
+    REQUIRE_ALL_TF_ALIGNED: bool = False
+    MTF_MIN_ALIGNMENT_PCT: int = 50
+    MTF_SCORE_BONUS: bool = True
+    
+    # -- Breaker Block (BB) Settings --
+    ENABLE_BREAKER_BLOCKS: bool = True
+    BB_LOOKBACK_CANDLES: int = 100
+    BB_SCORE_BONUS: bool = True
+    BB_MIN_QUALITY: str = "medium"
+    
+    # -- Volume & Volatility Filters --
+    MIN_VOLUME_RATIO: float = 0.6
+    MIN_ATR_PIPS: float = 3.0
+    MAX_ATR_PIPS: float = 20.0
+    
+    # -- Dynamic Risk Management --
+    ENABLE_DYNAMIC_RISK: bool = True
+    MIN_RISK_MULTIPLIER: float = 0.5
+    MAX_RISK_MULTIPLIER: float = 1.5
+    
+    # -- Dynamic Take Profit --
+    ENABLE_DYNAMIC_TP: bool = True
+    MIN_RR_RATIO: float = 2.0
+    MAX_RR_RATIO: float = 3.0
+    
+    # -- Telegram Notifications --
+    ENABLE_TELEGRAM: bool = True
+    TELEGRAM_NOTIFY_SIGNALS: bool = True
+    TELEGRAM_NOTIFY_TRADES: bool = True
+    TELEGRAM_NOTIFY_FILLS: bool = True
+    TELEGRAM_NOTIFY_BREAKEVEN: bool = True
+    TELEGRAM_NOTIFY_CLOSES: bool = True
+    TELEGRAM_NOTIFY_SKIPS: bool = False
+    TELEGRAM_DAILY_SUMMARY: bool = True
+    
+    # ============================================================================
+    # NEW: RISK MANAGEMENT SETTINGS
+    # ============================================================================
+    
+    # -- Daily/Weekly Drawdown Protection --
+    ENABLE_RISK_MANAGER: bool = True
+    MAX_DAILY_LOSS_PCT: float = 0.03  # Stop trading after 3% daily loss
+    MAX_WEEKLY_LOSS_PCT: float = 0.05  # Stop trading after 5% weekly loss
+    MAX_DAILY_TRADES: int = 20  # Maximum trades per day
+    
+    # -- Risk State File --
+    RISK_STATE_FILE: str = "risk_state.json"
+    
+    # ============================================================================
+    # NEW: NEWS CALENDAR SETTINGS
+    # ============================================================================
+    
+    # -- News Avoidance --
+    AVOID_HIGH_IMPACT_NEWS: bool = True
+    NEWS_BUFFER_MINUTES: int = 30  # Minutes before/after news to avoid trading
+    NEWS_CACHE_FILE: str = "news_cache.json"
+    
+    # -- News Calendar Source --
+    # Options: 'forexfactory' (requires scraping), 'manual' (fallback)
+    NEWS_SOURCE: str = 'forexfactory'
+    
+    # -- Manual News Times (UTC) - Fallback if API fails --
+    MANUAL_NEWS_TIMES: tuple = (
+        ("08:30", "09:00"),   # EUR economic data
+        ("12:30", "13:30"),   # US economic data (NFP, CPI, etc.)
+        ("14:00", "16:00"),   # FOMC meetings/minutes
+    )
+    
+    # ============================================================================
+    # NEW: TRADE LOGGING SETTINGS
+    # ============================================================================
+    
+    # -- Database Logging --
+    ENABLE_TRADE_LOGGING: bool = True
+    TRADE_DB_PATH: str = "trades.db"
+    
+    # -- Performance Reporting --
+    AUTO_CALCULATE_DAILY_PERFORMANCE: bool = True
+    PERFORMANCE_REPORT_DAYS: int = 7  # Days to include in reports
+    
+    # -- CSV Export --
+    AUTO_EXPORT_CSV: bool = False  # Set to True to auto-export trades daily
+    CSV_EXPORT_PATH: str = "trades_export.csv"
+    
+    # -- Bot Log --
+    BOT_LOG_FILE: str = "bot.log"  # Console output is also written here
+    
+    # ============================================================================
+    # NEW: BACKTESTING SETTINGS
+    # ============================================================================
+    
+    # -- Backtest Configuration --
+    BACKTEST_INITIAL_BALANCE: int = 10000
+    BACKTEST_LOOKBACK_DAYS: int = 30  # Test last N days
+    
+    # -- Backtest Output --
+    BACKTEST_RESULTS_FILE: str = "backtest_results.json"
 
 # ============================================================================
-# NEW: BACKTESTING SETTINGS
+# STRATEGY PROFILES
 # ============================================================================
 
-# -- Backtest Configuration --
-BACKTEST_INITIAL_BALANCE = 10000
-BACKTEST_LOOKBACK_DAYS = 30  # Test last N days
-
-# -- Backtest Output --
-BACKTEST_RESULTS_FILE = "backtest_results.json"
+# Per-strategy overrides on top of the defaults above, selected with the
+# SMC_PROFILE environment variable (default: "default")
+_PROFILES = {
+    "default": {},
+    "aggressive": {
+        "MIN_SETUP_QUALITY_SCORE": 60,
+    },
+    "conservative": {
+        "MIN_SETUP_QUALITY_SCORE": 65,
+    },
+}
+
+PROFILE = os.getenv("SMC_PROFILE", "default")
+if PROFILE not in _PROFILES:
+    print(f"⚠️  Unknown SMC_PROFILE '{PROFILE}', using 'default'")
+    PROFILE = "default"
+
+CFG = Config(**_PROFILES[PROFILE])
 
 # ============================================================================
 # ENVIRONMENT VARIABLES (Required in .env file)
@@ -138,19 +174,19 @@ def validate_config():
     """Validate configuration settings."""
     errors = []
     
-    if MAX_DAILY_LOSS_PCT <= 0 or MAX_DAILY_LOSS_PCT > 0.1:
+    if CFG.MAX_DAILY_LOSS_PCT <= 0 or CFG.MAX_DAILY_LOSS_PCT > 0.1:
         errors.append("MAX_DAILY_LOSS_PCT should be between 0 and 0.1 (0-10%)")
     
-    if MAX_WEEKLY_LOSS_PCT <= 0 or MAX_WEEKLY_LOSS_PCT > 0.2:
+    if CFG.MAX_WEEKLY_LOSS_PCT <= 0 or CFG.MAX_WEEKLY_LOSS_PCT > 0.2:
         errors.append("MAX_WEEKLY_LOSS_PCT should be between 0 and 0.2 (0-20%)")
     
-    if MAX_DAILY_LOSS_PCT >= MAX_WEEKLY_LOSS_PCT:
+    if CFG.MAX_DAILY_LOSS_PCT >= CFG.MAX_WEEKLY_LOSS_PCT:
         errors.append("MAX_WEEKLY_LOSS_PCT should be greater than MAX_DAILY_LOSS_PCT")
     
-    if NEWS_BUFFER_MINUTES < 15 or NEWS_BUFFER_MINUTES > 120:
+    if CFG.NEWS_BUFFER_MINUTES < 15 or CFG.NEWS_BUFFER_MINUTES > 120:
         errors.append("NEWS_BUFFER_MINUTES should be between 15 and 120 minutes")
     
-    if MIN_SETUP_QUALITY_SCORE < 0 or MIN_SETUP_QUALITY_SCORE > 100:
+    if CFG.MIN_SETUP_QUALITY_SCORE < 0 or CFG.MIN_SETUP_QUALITY_SCORE > 100:
         errors.append("MIN_SETUP_QUALITY_SCORE should be between 0 and 100")
     
     if errors:
@@ -1,17 +1,176 @@
-import pandas as pd
+import numpy as np
+from datetime import datetime
 import MetaTrader5 as mt5
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from numba import njit
+
+# Readable names for the MT5 timeframe constants (see get_timeframe_name)
+_TF_NAMES = {
+    mt5.TIMEFRAME_M1: "M1",
+    mt5.TIMEFRAME_M5: "M5",
+    mt5.TIMEFRAME_M15: "M15",
+    mt5.TIMEFRAME_M30: "M30",
+    mt5.TIMEFRAME_H1: "H1",
+    mt5.TIMEFRAME_H4: "H4",
+    mt5.TIMEFRAME_D1: "D1"
+}
+
+# Bar length in seconds per MT5 timeframe, used to key the OHLC cache on the current bar
+_TF_SECONDS = {
+    mt5.TIMEFRAME_M1: 60,
+    mt5.TIMEFRAME_M5: 300,
+    mt5.TIMEFRAME_M15: 900,
+    mt5.TIMEFRAME_M30: 1800,
+    mt5.TIMEFRAME_H1: 3600,
+    mt5.TIMEFRAME_H4: 14400,
+    mt5.TIMEFRAME_D1: 86400
+}
+
+# Historical Order Blocks as one structured array (type: 1 = bullish, 0 = bearish;
+# time in epoch seconds; index is the candle position within the lookback window)
+OB_DTYPE = np.dtype([
+    ('type', 'i1'),
+    ('high', 'f8'),
+    ('low', 'f8'),
+    ('open', 'f8'),
+    ('close', 'f8'),
+    ('time', 'i8'),
+    ('index', 'i8')
+])
+
+@njit(cache=True)
+def _atr_last_nb(high, low, close, alpha):
+    """
+    Last value of an adjust=False EMA of the True Range, seeded with the first
+    candle's TR. The first candle has no previous close, so its TR is high - low.
+    """
+    ema = high[0] - low[0]
+    for i in range(1, close.shape[0]):
+        prev_close = close[i - 1]
+        tr = max(max(high[i] - low[i], abs(high[i] - prev_close)), abs(low[i] - prev_close))
+        ema = alpha * tr + (1.0 - alpha) * ema
+    return ema
+
+# Worker threads for fetching the MTF timeframes concurrently (the MT5 call blocks on the terminal pipe)
+_MTF_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mtf-fetch")
+
+# Per-thread (4, n) float64 buffers the OHLC fields are copied into for the jitted scans
+_OHLC_BUFFERS = threading.local()
+
+def _ohlc_rows(rates):
+    """
+    Copies the open/high/low/close fields of a rates array into a reusable
+    (4, len(rates)) float64 buffer and returns its four rows. The rows are
+    contiguous (the fields of a structured array are strided views) and are
+    overwritten by the next call with the same length on this thread.
+    """
+    buffers = getattr(_OHLC_BUFFERS, 'by_length', None)
+    if buffers is None:
+        buffers = _OHLC_BUFFERS.by_length = {}
+    n = len(rates)
+    ohlc = buffers.get(n)
+    if ohlc is None:
+        ohlc = buffers[n] = np.empty((4, n), dtype=np.float64)
+    ohlc[0] = rates['open']
+    ohlc[1] = rates['high']
+    ohlc[2] = rates['low']
+    ohlc[3] = rates['close']
+    return ohlc[0], ohlc[1], ohlc[2], ohlc[3]
+
+def _current_bar_epoch(symbol, timeframe):
+    """
+    Returns the index of the bar the last tick falls in, or None if it
+    can't be determined (unknown timeframe or no tick available).
+    """
+    seconds = _TF_SECONDS.get(timeframe)
+    if seconds is None:
+        return None
+    
+    tick = mt5.symbol_info_tick(symbol)
+    if tick is None:
+        return None
+    
+    return tick.time // seconds
+
+@lru_cache(maxsize=32)
+def _cached_ohlc_raw(symbol, timeframe, count, bar_epoch):
+    """One MT5 fetch per (symbol, timeframe, count) per bar; bar_epoch only keys the cache."""
+    return mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+
+def get_ohlc_raw(symbol, timeframe, count=100):
+    """
+    Fetches OHLC data from MT5 as the structured array returned by the terminal
+    (fields time/open/high/low/close/tick_volume/spread/real_volume, time in epoch seconds).
+    
+    Results are cached until a new bar opens on the timeframe, so repeated
+    calls within the same bar reuse a single terminal round-trip. The array is
+    shared between callers and must not be modified.
+    """
+    bar_epoch = _current_bar_epoch(symbol, timeframe)
+    if bar_epoch is None:
+        return mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
+    
+    rates = _cached_ohlc_raw(symbol, timeframe, count, bar_epoch)
+    if rates is None:
+        # Don't keep a failed fetch around for the rest of the bar
+        _cached_ohlc_raw.cache_clear()
+    return rates
 
 def get_ohlc_data(symbol, timeframe, count=100):
-    """Fetches OHLC data from MT5 and returns it as a Pandas DataFrame."""
+    """
+    Fetches OHLC data from MT5 as the terminal's structured rates array
+    (see get_ohlc_raw). All analysis functions in this module take this array
+    and read its fields (rates['high'], ...) as NumPy views.
+    """
+    return get_ohlc_raw(symbol, timeframe, count)
+
+# Last `count` bars per (symbol, timeframe, count), kept up to date by get_ohlc_rolling
+_ROLLING_RATES = {}
+
+def get_ohlc_rolling(symbol, timeframe, count=100):
+    """
+    Same data as get_ohlc_data, for a series that is polled continuously.
+    After the first full fetch only the last two bars are requested from MT5:
+    the forming bar is refreshed in place and, when a new bar has opened, the
+    buffer shifts by one. A full fetch is made again if bars were missed.
+    
+    The returned array is the buffer itself and is updated in place by the
+    next call for the same series.
+    """
+    key = (symbol, timeframe, count)
+    buffer = _ROLLING_RATES.get(key)
+    if buffer is not None:
+        last_two = mt5.copy_rates_from_pos(symbol, timeframe, 0, 2)
+        if last_two is not None and len(last_two) == 2:
+            if last_two[1]['time'] == buffer[-1]['time']:
+                # Same forming bar
+                buffer[-1] = last_two[1]
+                return buffer
+            if last_two[0]['time'] == buffer[-1]['time']:
+                # The forming bar closed and a new one opened
+                buffer[:-1] = buffer[1:]
+                buffer[-2:] = last_two
+                return buffer
+    
     rates = mt5.copy_rates_from_pos(symbol, timeframe, 0, count)
-    df = pd.DataFrame(rates)
-    df['time'] = pd.to_datetime(df['time'], unit='s')
-    return df
+    if rates is None or len(rates) < 2:
+        _ROLLING_RATES.pop(key, None)
+        return rates
+    
+    _ROLLING_RATES[key] = buffer = np.array(rates)
+    return buffer
+
+def _to_datetime(epoch):
+    """Converts an MT5 bar time in epoch seconds to a naive UTC datetime."""
+    return datetime.utcfromtimestamp(int(epoch))
 
 def calculate_atr(symbol, period=14, timeframe=mt5.TIMEFRAME_H1):
     """
     Calculate Average True Range for volatility filtering.
     Uses H1 timeframe for more stable ATR calculation.
+    The value is memoized per bar of the ATR timeframe.
     
     Args:
         symbol: Trading symbol
@@ -21,108 +180,154 @@ def calculate_atr(symbol, period=14, timeframe=mt5.TIMEFRAME_H1):
     Returns:
         ATR value as float
     """
+    bar_epoch = _current_bar_epoch(symbol, timeframe)
+    if bar_epoch is None:
+        return _compute_atr(symbol, period, timeframe)
+    
+    return _cached_atr(symbol, period, timeframe, bar_epoch)
+
+@lru_cache(maxsize=8)
+def _cached_atr(symbol, period, timeframe, bar_epoch):
+    """ATR memoized on the current bar of its timeframe."""
+    return _compute_atr(symbol, period, timeframe)
+
+def _compute_atr(symbol, period, timeframe):
+    """Computes ATR from a fresh (or bar-cached) OHLC fetch."""
     # Fetch more data from H1 timeframe for better ATR calculation
-    df = get_ohlc_data(symbol, timeframe, count=period * 3)
+    rates = get_ohlc_raw(symbol, timeframe, count=period * 3)
     
-    if len(df) < period:
+    if rates is None or len(rates) < period:
         return 0.0
     
-    high = df['high']
-    low = df['low']
-    close = df['close']
-    
-    # Calculate True Range
-    tr1 = high - low
-    tr2 = abs(high - close.shift())
-    tr3 = abs(low - close.shift())
-    
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-    
-    # Calculate ATR using exponential moving average
-    atr = tr.ewm(span=period, adjust=False).mean().iloc[-1]
+    # True Range and its exponential moving average in one compiled pass
+    # (only the last value is needed, so run the recurrence instead of a full ewm)
+    open_, high, low, close = _ohlc_rows(rates)
+    atr = _atr_last_nb(high, low, close, 2.0 / (period + 1))
     
     return atr
 
-def calculate_volume_ratio(df, period=20):
+def calculate_volume_ratio(rates, period=20):
     """
     Calculate current volume vs average volume.
     
     Args:
-        df: DataFrame with OHLC data
+        rates: MT5 rates array with OHLC data
         period: Period for average calculation (default: 20)
     
     Returns:
         Volume ratio as float (1.0 = average, 2.0 = double average, etc.)
     """
-    if 'tick_volume' not in df.columns:
+    if 'tick_volume' not in rates.dtype.names:
         return 1.0
     
-    if len(df) < period + 1:
+    if len(rates) < period + 1:
         return 1.0
     
-    avg_volume = df['tick_volume'].rolling(window=period).mean().iloc[-2]
-    current_volume = df['tick_volume'].iloc[-2]
+    # Average over the period ending at the last completed candle
+    volume = rates['tick_volume']
+    avg_volume = volume[-period-1:-1].mean()
+    current_volume = volume[-2]
     
-    if avg_volume == 0 or pd.isna(avg_volume):
+    if avg_volume == 0 or np.isnan(avg_volume):
         return 1.0
     
     return current_volume / avg_volume
 
-def detect_mss_and_sl(df):
+def _swing_points(high, low):
+    """
+    Marks simple n=1 swing points: a candle whose high (low) is above (below)
+    both neighbours. The first and last candles can never be swings.
+    
+    Returns:
+        Tuple of boolean arrays (swing_high, swing_low)
+    """
+    swing_high = np.zeros(high.shape[0], dtype=bool)
+    swing_low = np.zeros(low.shape[0], dtype=bool)
+    swing_high[1:-1] = (high[1:-1] > high[:-2]) & (high[1:-1] > high[2:])
+    swing_low[1:-1] = (low[1:-1] < low[:-2]) & (low[1:-1] < low[2:])
+    return swing_high, swing_low
+
+@lru_cache(maxsize=8)
+def _cached_swing_indices(high_bytes, low_bytes):
+    """Swing indices for the given float64 buffers; the cache key is the raw bytes."""
+    high = np.frombuffer(high_bytes, dtype=np.float64)
+    low = np.frombuffer(low_bytes, dtype=np.float64)
+    swing_high, swing_low = _swing_points(high, low)
+    
+    swing_high_idx = np.flatnonzero(swing_high)
+    swing_low_idx = np.flatnonzero(swing_low)
+    swing_high_idx.setflags(write=False)
+    swing_low_idx.setflags(write=False)
+    return swing_high_idx, swing_low_idx
+
+def _swing_indices(high, low):
+    """
+    Returns the indices of the swing highs and lows, computed once per
+    distinct set of candles so repeated detect_mss_and_sl calls on the same
+    frame within a bar don't rescan it. The returned arrays are read-only.
+    """
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    return _cached_swing_indices(high.tobytes(), low.tobytes())
+
+def detect_mss_and_sl(rates):
     """
     Detects a Market Structure Shift (MSS) and returns the shift type and the stop loss level.
     """
+    high = rates['high']
+    low = rates['low']
+    close = rates['close']
+    
     # Identify swing points (a simple n=1 implementation)
-    df['swing_high'] = (df['high'] > df['high'].shift(1)) & (df['high'] > df['high'].shift(-1))
-    df['swing_low'] = (df['low'] < df['low'].shift(1)) & (df['low'] < df['low'].shift(-1))
-
-    # We look at the most recently completed candle, which is at index -2
-    last_candle = df.iloc[-2]
+    swing_high_idx, swing_low_idx = _swing_indices(high, low)
     
-    # Find the most recent swing points prior to the last candle
-    swing_highs = df[df['swing_high']].iloc[:-2]
-    swing_lows = df[df['swing_low']].iloc[:-2]
-
-    if swing_highs.empty or swing_lows.empty:
+    # Find the most recent swing points, skipping the last two (they can still be
+    # the candle being evaluated or the one still forming)
+    swing_high_idx = swing_high_idx[:-2]
+    swing_low_idx = swing_low_idx[:-2]
+    
+    if swing_high_idx.size == 0 or swing_low_idx.size == 0:
         return None, None
-
-    last_swing_high = swing_highs.iloc[-1]
-    last_swing_low = swing_lows.iloc[-1]
-
+    
+    # We look at the most recently completed candle, which is at index -2
+    last_close = close[-2]
+    
     # Check for MSS
-    bullish_mss = last_candle['close'] > last_swing_high['high']
-    bearish_mss = last_candle['close'] < last_swing_low['low']
-
+    bullish_mss = last_close > high[swing_high_idx[-1]]
+    bearish_mss = last_close < low[swing_low_idx[-1]]
+    
     if bullish_mss:
         # Stop loss is placed at the low of the candle that caused the shift
-        return "bullish", last_candle['low']
+        return "bullish", low[-2]
     elif bearish_mss:
         # Stop loss is placed at the high of the candle that caused the shift
-        return "bearish", last_candle['high']
+        return "bearish", high[-2]
     
     return None, None
 
-def find_fvg(df):
+def find_fvg(rates):
     """
     Identifies the most recent Fair Value Gap (FVG) and returns its high and low.
     Looks at the last 3 completed candles.
     """
-    # We look at the pattern in the 3 most recently completed candles (indices -4, -3, -2)
-    candle_1 = df.iloc[-4]
-    candle_2 = df.iloc[-3]
-    candle_3 = df.iloc[-2]
-
+    # We look at the pattern in the 3 most recently completed candles (indices -4, -3, -2);
+    # only candles 1 and 3 matter, so read their four values straight from the arrays
+    high = rates['high']
+    low = rates['low']
+    c1_high, c1_low = high[-4], low[-4]
+    c3_high, c3_low = high[-2], low[-2]
+    
     # Bullish FVG: The low of candle 3 is higher than the high of candle 1
-    if candle_3['low'] > candle_1['high']:
-        return {"high": candle_3['low'], "low": candle_1['high'], "type": "bullish"}
-
+    if c3_low > c1_high:
+        return {"high": c3_low, "low": c1_high, "type": "bullish"}
+    
     # Bearish FVG: The high of candle 3 is lower than the low of candle 1
-    if candle_3['high'] < candle_1['low']:
-        return {"high": candle_1['low'], "low": candle_3['high'], "type": "bearish"}
+    if c3_high < c1_low:
+        return {"high": c1_low, "low": c3_high, "type": "bearish"}
         
     return None
 
-def find_order_block(df, mss_type, lookback=20):
+def find_order_block(rates, mss_type, lookback=20):
     """
     Identifies the Order Block (OB) based on the MSS direction.
     
@@ -131,7 +336,7 @@ def find_order_block(df, mss_type, lookback=20):
     - Bearish OB: Last bullish candle before bearish MSS (where institutions sold)
     
     Args:
-        df: DataFrame with OHLC data
+        rates: MT5 rates array with OHLC data
         mss_type: "bullish" or "bearish"
         lookback: Number of candles to look back for OB (default: 20)
     
@@ -142,51 +347,144 @@ def find_order_block(df, mss_type, lookback=20):
         return None
     
     # Look at recent candles (exclude the last one which is incomplete)
-    recent_candles = df.iloc[-lookback-1:-1]
+    open_ = rates['open']
+    close = rates['close']
+    start = max(len(close) - lookback - 1, 0)
+    recent_open = open_[start:-1]
+    recent_close = close[start:-1]
     
     if mss_type == "bullish":
-        # Find the last bearish candle (close < open) before the bullish move
-        bearish_candles = recent_candles[recent_candles['close'] < recent_candles['open']]
-        
-        if bearish_candles.empty:
-            return None
-        
-        # The most recent bearish candle is the Bullish Order Block
-        ob_candle = bearish_candles.iloc[-1]
-        
-        return {
-            "type": "bullish",
-            "high": ob_candle['high'],
-            "low": ob_candle['low'],
-            "open": ob_candle['open'],
-            "close": ob_candle['close'],
-            "time": ob_candle['time'],
-            "body_high": max(ob_candle['open'], ob_candle['close']),
-            "body_low": min(ob_candle['open'], ob_candle['close'])
-        }
-    
+        # The most recent bearish candle (close < open) is the Bullish Order Block
+        mask = recent_close < recent_open
     elif mss_type == "bearish":
-        # Find the last bullish candle (close > open) before the bearish move
-        bullish_candles = recent_candles[recent_candles['close'] > recent_candles['open']]
-        
-        if bullish_candles.empty:
-            return None
-        
-        # The most recent bullish candle is the Bearish Order Block
-        ob_candle = bullish_candles.iloc[-1]
-        
-        return {
-            "type": "bearish",
-            "high": ob_candle['high'],
-            "low": ob_candle['low'],
-            "open": ob_candle['open'],
-            "close": ob_candle['close'],
-            "time": ob_candle['time'],
-            "body_high": max(ob_candle['open'], ob_candle['close']),
-            "body_low": min(ob_candle['open'], ob_candle['close'])
-        }
+        # The most recent bullish candle (close > open) is the Bearish Order Block
+        mask = recent_close > recent_open
+    else:
+        return None
     
-    return None
+    if not mask.any():
+        return None
+    
+    # Last True in the mask: first True of the reversed view, no index array built
+    last = mask.size - 1 - int(np.argmax(mask[::-1]))
+    return _order_block_dict(rates, start + last, mss_type)
+
+def _order_block_dict(rates, k, ob_type):
+    """Builds the OB dict for the candle at position k of the rates array."""
+    ob_open = rates['open'][k]
+    ob_close = rates['close'][k]
+    
+    return {
+        "type": ob_type,
+        "high": rates['high'][k],
+        "low": rates['low'][k],
+        "open": ob_open,
+        "close": ob_close,
+        "time": _to_datetime(rates['time'][k]),
+        "body_high": max(ob_open, ob_close),
+        "body_low": min(ob_open, ob_close)
+    }
+
+# Explicit signature: compiled (or loaded from the on-disk cache) at import rather
+# than on the first candle, and only accepts the contiguous rows from _ohlc_rows
+@njit("Tuple((i8, f8, i8, i8, f8, f8))(f8[::1], f8[::1], f8[::1], f8[::1], i8)", cache=True)
+def _scan_setup_nb(open_, high, low, close, ob_lookback):
+    """
+    Single backward pass computing what detect_mss_and_sl, find_order_block and
+    find_fvg would return for the same candles.
+    
+    Returns:
+        Tuple (mss, stop_loss, ob_index, fvg, fvg_high, fvg_low) where mss and
+        fvg are 1 = bullish, -1 = bearish, 0 = none and ob_index is -1 if no OB
+    """
+    n = close.shape[0]
+    
+    # MSS: the third most recent swing high/low (the last two are skipped, as in
+    # detect_mss_and_sl), checked against the last completed candle at n - 2
+    swing_high = np.nan
+    swing_low = np.nan
+    highs_found = 0
+    lows_found = 0
+    for i in range(n - 2, 0, -1):
+        if highs_found < 3 and high[i] > high[i - 1] and high[i] > high[i + 1]:
+            highs_found += 1
+            if highs_found == 3:
+                swing_high = high[i]
+        if lows_found < 3 and low[i] < low[i - 1] and low[i] < low[i + 1]:
+            lows_found += 1
+            if lows_found == 3:
+                swing_low = low[i]
+        if highs_found == 3 and lows_found == 3:
+            break
+    
+    mss = 0
+    stop_loss = np.nan
+    if highs_found == 3 and lows_found == 3:
+        if close[n - 2] > swing_high:
+            mss = 1
+            stop_loss = low[n - 2]
+        elif close[n - 2] < swing_low:
+            mss = -1
+            stop_loss = high[n - 2]
+    
+    # OB: last opposing candle among the ob_lookback candles before the forming one
+    ob_index = -1
+    if mss != 0:
+        for i in range(n - 2, max(n - ob_lookback - 1, 0) - 1, -1):
+            if (mss == 1 and close[i] < open_[i]) or (mss == -1 and close[i] > open_[i]):
+                ob_index = i
+                break
+    
+    # FVG: candles n - 4 and n - 2
+    fvg = 0
+    fvg_high = np.nan
+    fvg_low = np.nan
+    if low[n - 2] > high[n - 4]:
+        fvg = 1
+        fvg_high = low[n - 2]
+        fvg_low = high[n - 4]
+    elif high[n - 2] < low[n - 4]:
+        fvg = -1
+        fvg_high = low[n - 4]
+        fvg_low = high[n - 2]
+    
+    return mss, stop_loss, ob_index, fvg, fvg_high, fvg_low
+
+def detect_setup(rates, ob_lookback=20):
+    """
+    Runs MSS, Order Block and FVG detection in one jitted pass over the candles.
+    Equivalent to calling detect_mss_and_sl, find_order_block (only when an MSS
+    was found) and find_fvg separately.
+    
+    Args:
+        rates: MT5 rates array with OHLC data
+        ob_lookback: Number of candles to look back for the OB (default: 20)
+    
+    Returns:
+        Tuple (mss_type, stop_loss, order_block, fvg) in the same formats as the
+        individual functions
+    """
+    open_, high, low, close = _ohlc_rows(rates)
+    mss, stop_loss, ob_index, fvg_code, fvg_high, fvg_low = _scan_setup_nb(
+        open_, high, low, close, ob_lookback
+    )
+    
+    if mss == 0:
+        mss_type, stop_loss = None, None
+    else:
+        mss_type = "bullish" if mss == 1 else "bearish"
+        stop_loss = low[-2] if mss == 1 else high[-2]
+    
+    order_block = _order_block_dict(rates, ob_index, mss_type) if ob_index >= 0 else None
+    
+    if fvg_code == 1:
+        fvg = {"high": low[-2], "low": high[-4], "type": "bullish"}
+    elif fvg_code == -1:
+        fvg = {"high": low[-4], "low": high[-2], "type": "bearish"}
+    else:
+        fvg = None
+    
+    return mss_type, stop_loss, order_block, fvg
 
 def check_confluence(order_block, fvg, min_overlap_pct=30):
     """
@@ -203,29 +501,31 @@ def check_confluence(order_block, fvg, min_overlap_pct=30):
     if order_block is None or fvg is None:
         return None
     
-    if order_block['type'] != fvg['type']:
+    ob_type = order_block['type']
+    if ob_type != fvg['type']:
         return None
     
-    # Calculate overlap between OB and FVG zones
-    overlap_high = min(order_block['high'], fvg['high'])
-    overlap_low = max(order_block['low'], fvg['low'])
+    # Calculate overlap between OB and FVG zones (two-way compares, cheaper than min/max)
+    ob_high, ob_low = order_block['high'], order_block['low']
+    fvg_high, fvg_low = fvg['high'], fvg['low']
+    overlap_high = fvg_high if fvg_high < ob_high else ob_high
+    overlap_low = fvg_low if fvg_low > ob_low else ob_low
     
     # Check if there's actual overlap
     if overlap_low >= overlap_high:
         return None
     
+    # Calculate overlap as percentage of FVG size (fvg_size > 0 here: a real
+    # overlap is only possible inside a non-empty FVG)
     overlap_size = overlap_high - overlap_low
-    fvg_size = fvg['high'] - fvg['low']
-    ob_size = order_block['high'] - order_block['low']
-    
-    # Calculate overlap as percentage of FVG size
-    overlap_pct = (overlap_size / fvg_size) * 100 if fvg_size > 0 else 0
+    overlap_pct = (overlap_size / (fvg_high - fvg_low)) * 100
     
+    # Reject before building anything else
     if overlap_pct < min_overlap_pct:
         return None
     
     return {
-        "type": order_block['type'],
+        "type": ob_type,
         "overlap_high": overlap_high,
         "overlap_low": overlap_low,
         "overlap_size": overlap_size,
@@ -235,6 +535,17 @@ def check_confluence(order_block, fvg, min_overlap_pct=30):
         "quality": "high" if overlap_pct >= 70 else "medium" if overlap_pct >= 50 else "low"
     }
 
+# Confluence entry rules keyed on (quality, type); type only matters for medium
+_ENTRY_DISPATCH = {
+    # Strong confluence: Use middle of overlap for best fill probability
+    ("high", None): lambda c, ob: (c['overlap_high'] + c['overlap_low']) / 2,
+    # Medium confluence: Top of overlap for buys, bottom for sells
+    ("medium", "bullish"): lambda c, ob: c['overlap_high'],
+    ("medium", "bearish"): lambda c, ob: c['overlap_low'],
+    # Weak confluence: Use Order Block body (50% retracement)
+    ("low", None): lambda c, ob: (ob['body_high'] + ob['body_low']) / 2,
+}
+
 def get_refined_entry(order_block, fvg, confluence):
     """
     Determines the optimal entry price based on OB, FVG, and confluence.
@@ -254,26 +565,17 @@ def get_refined_entry(order_block, fvg, confluence):
         Refined entry price
     """
     if confluence:
-        # Strong confluence: Use middle of overlap for best fill probability
-        if confluence['quality'] == "high":
-            return (confluence['overlap_high'] + confluence['overlap_low']) / 2
-        
-        # Medium confluence: Use optimal edge
-        elif confluence['quality'] == "medium":
-            if confluence['type'] == "bullish":
-                return confluence['overlap_high']  # Top of overlap for buys
-            else:
-                return confluence['overlap_low']  # Bottom of overlap for sells
-        
-        # Weak confluence: Use Order Block body (50% retracement)
-        else:
-            return (order_block['body_high'] + order_block['body_low']) / 2
+        quality = confluence['quality']
+        key = (quality, confluence['type'] if quality == "medium" else None)
+        return _ENTRY_DISPATCH[key](confluence, order_block)
     
     # No confluence: Fall back to FVG edge (original strategy)
-    if order_block and order_block['type'] == "bullish":
-        return order_block['body_low']  # Bottom of OB body for buys
-    elif order_block and order_block['type'] == "bearish":
-        return order_block['body_high']  # Top of OB body for sells
+    if order_block:
+        ob_type = order_block['type']
+        if ob_type == "bullish":
+            return order_block['body_low']  # Bottom of OB body for buys
+        elif ob_type == "bearish":
+            return order_block['body_high']  # Top of OB body for sells
     
     # Absolute fallback: FVG edge
     if fvg:
@@ -281,13 +583,23 @@ def get_refined_entry(order_block, fvg, confluence):
     
     return None
 
-def analyze_setup_quality(mss_type, order_block, fvg, confluence):
+def analyze_setup_quality(mss_type, order_block, fvg, confluence, min_required=0):
     """
     Analyzes the overall quality of the trading setup.
     
+    Args:
+        min_required: Score the caller will reject below. If even a full
+            score for every component present can't reach it, that upper
+            bound is returned as a POOR setup without building the factors
+    
     Returns:
         Dictionary with quality score and description
     """
+    max_score = (25 if mss_type else 0) + (25 if order_block else 0) + \
+                (25 if fvg else 0) + (25 if confluence else 0)
+    if max_score < min_required:
+        return {"score": max_score, "quality": "POOR", "factors": []}
+    
     score = 0
     factors = []
     
@@ -334,39 +646,69 @@ def analyze_setup_quality(mss_type, order_block, fvg, confluence):
         "factors": factors
     }
 
-def detect_trend(df, lookback=20):
+@njit(cache=True)
+def _last_two_swings_nb(high, low, start):
+    """
+    Scans backwards from the last closed candle down to start and returns the
+    values of the last two swing highs and swing lows (NaN where missing),
+    stopping as soon as both pairs are found.
+    
+    Returns:
+        Tuple (last_high, prev_high, last_low, prev_low)
+    """
+    last_high = prev_high = last_low = prev_low = np.nan
+    highs_found = 0
+    lows_found = 0
+    
+    for i in range(high.shape[0] - 2, max(start, 1) - 1, -1):
+        if highs_found < 2 and high[i] > high[i - 1] and high[i] > high[i + 1]:
+            if highs_found == 0:
+                last_high = high[i]
+            else:
+                prev_high = high[i]
+            highs_found += 1
+        
+        if lows_found < 2 and low[i] < low[i - 1] and low[i] < low[i + 1]:
+            if lows_found == 0:
+                last_low = low[i]
+            else:
+                prev_low = low[i]
+            lows_found += 1
+        
+        if highs_found == 2 and lows_found == 2:
+            break
+    
+    return last_high, prev_high, last_low, prev_low
+
+def detect_trend(rates, lookback=20):
     """
     Detects the current trend based on swing highs and lows.
     
     Args:
-        df: DataFrame with OHLC data
+        rates: MT5 rates array with OHLC data
         lookback: Number of candles to analyze
     
     Returns:
         "bullish", "bearish", or "ranging"
     """
-    recent_df = df.iloc[-lookback:]
-    
-    # Calculate swing points
-    recent_df = recent_df.copy()
-    recent_df['swing_high'] = (recent_df['high'] > recent_df['high'].shift(1)) & \
-                               (recent_df['high'] > recent_df['high'].shift(-1))
-    recent_df['swing_low'] = (recent_df['low'] < recent_df['low'].shift(1)) & \
-                              (recent_df['low'] < recent_df['low'].shift(-1))
+    high = rates['high']
+    low = rates['low']
     
-    swing_highs = recent_df[recent_df['swing_high']]['high'].values
-    swing_lows = recent_df[recent_df['swing_low']]['low'].values
+    # Last two swing highs/lows inside the window (a swing needs both neighbours
+    # in the window, so the window's first candle is excluded)
+    window_start = len(high) - len(high[-lookback:]) + 1
+    last_high, prev_high, last_low, prev_low = _last_two_swings_nb(high, low, window_start)
     
-    if len(swing_highs) < 2 or len(swing_lows) < 2:
+    if np.isnan(prev_high) or np.isnan(prev_low):
         return "ranging"
     
     # Check if making higher highs and higher lows (bullish)
-    higher_highs = swing_highs[-1] > swing_highs[-2] if len(swing_highs) >= 2 else False
-    higher_lows = swing_lows[-1] > swing_lows[-2] if len(swing_lows) >= 2 else False
+    higher_highs = last_high > prev_high
+    higher_lows = last_low > prev_low
     
     # Check if making lower highs and lower lows (bearish)
-    lower_highs = swing_highs[-1] < swing_highs[-2] if len(swing_highs) >= 2 else False
-    lower_lows = swing_lows[-1] < swing_lows[-2] if len(swing_lows) >= 2 else False
+    lower_highs = last_high < prev_high
+    lower_lows = last_low < prev_low
     
     if higher_highs and higher_lows:
         return "bullish"
@@ -375,9 +717,67 @@ def detect_trend(df, lookback=20):
     else:
         return "ranging"
 
+def _analyze_timeframe(symbol, tf, lookback):
+    """Trend, MSS and Order Block analysis of one timeframe for get_mtf_structure."""
+    rates = get_ohlc_data(symbol, tf, count=lookback)
+    
+    # Detect trend
+    trend = detect_trend(rates, lookback=min(20, lookback))
+    
+    # Detect MSS on this timeframe
+    mss_type, _ = detect_mss_and_sl(rates)
+    
+    # Find Order Block on this timeframe
+    ob = find_order_block(rates, mss_type, lookback=min(20, lookback)) if mss_type else None
+    
+    return {
+        "timeframe": tf,
+        "trend": trend,
+        "mss": mss_type,
+        "has_ob": ob is not None,
+        "ob": ob
+    }
+
+@lru_cache(maxsize=16)
+def _cached_timeframe_analysis(symbol, tf, lookback, bar_epoch):
+    """Timeframe analysis memoized on the current bar; bar_epoch only keys the cache."""
+    return _analyze_timeframe(symbol, tf, lookback)
+
+def _timeframe_analysis(symbol, tf, lookback):
+    """
+    Returns the analysis of one timeframe, reusing the result computed earlier in
+    the same bar (the candles come from the per-bar OHLC cache, so it can't change).
+    """
+    bar_epoch = _current_bar_epoch(symbol, tf)
+    if bar_epoch is None:
+        return _analyze_timeframe(symbol, tf, lookback)
+    
+    return dict(_cached_timeframe_analysis(symbol, tf, lookback, bar_epoch))
+
+def start_mtf_structure(symbol, timeframes=[mt5.TIMEFRAME_M5, mt5.TIMEFRAME_M15], lookback=50):
+    """
+    Starts the get_mtf_structure analysis in the background so it can overlap
+    other work (e.g. the M1 analysis).
+    
+    Returns:
+        A function that waits for the analysis and returns the same dictionary
+        as get_mtf_structure
+    """
+    # Run all timeframes at once so the wait is the slowest fetch, not the sum
+    futures = {tf: _MTF_POOL.submit(_timeframe_analysis, symbol, tf, lookback) for tf in timeframes}
+    
+    def result():
+        mtf_analysis = {}
+        for tf, future in futures.items():
+            mtf_analysis[get_timeframe_name(tf)] = future.result()
+        return mtf_analysis
+    
+    return result
+
 def get_mtf_structure(symbol, timeframes=[mt5.TIMEFRAME_M5, mt5.TIMEFRAME_M15], lookback=50):
     """
     Analyzes market structure across multiple timeframes.
+    Each timeframe is only re-analyzed once a new bar has opened on it.
     
     Args:
         symbol: Trading symbol
@@ -387,45 +787,11 @@ def get_mtf_structure(symbol, timeframes=[mt5.TIMEFRAME_M5, mt5.TIMEFRAME_M15],
     Returns:
         Dictionary with structure analysis for each timeframe
     """
-    mtf_analysis = {}
-    
-    for tf in timeframes:
-        df = get_ohlc_data(symbol, tf, count=lookback)
-        
-        # Detect trend
-        trend = detect_trend(df, lookback=min(20, lookback))
-        
-        # Detect MSS on this timeframe
-        mss_type, _ = detect_mss_and_sl(df)
-        
-        # Find Order Block on this timeframe
-        ob = find_order_block(df, mss_type, lookback=min(20, lookback)) if mss_type else None
-        
-        # Get timeframe name
-        tf_name = get_timeframe_name(tf)
-        
-        mtf_analysis[tf_name] = {
-            "timeframe": tf,
-            "trend": trend,
-            "mss": mss_type,
-            "has_ob": ob is not None,
-            "ob": ob
-        }
-    
-    return mtf_analysis
+    return start_mtf_structure(symbol, timeframes, lookback)()
 
 def get_timeframe_name(timeframe):
     """Convert MT5 timeframe constant to readable name."""
-    tf_map = {
-        mt5.TIMEFRAME_M1: "M1",
-        mt5.TIMEFRAME_M5: "M5",
-        mt5.TIMEFRAME_M15: "M15",
-        mt5.TIMEFRAME_M30: "M30",
-        mt5.TIMEFRAME_H1: "H1",
-        mt5.TIMEFRAME_H4: "H4",
-        mt5.TIMEFRAME_D1: "D1"
-    }
-    return tf_map.get(timeframe, "Unknown")
+    return _TF_NAMES.get(timeframe, "Unknown")
 
 def check_mtf_alignment(m1_signal, mtf_analysis, require_all_aligned=False):
     """
@@ -520,7 +886,27 @@ def calculate_mtf_score_bonus(mtf_alignment):
     else:
         return 5
 
-def detect_breaker_block(df, recent_obs, lookback=50):
+@njit(cache=True)
+def _ob_breaks_nb(closes, ob_highs, ob_lows, ob_is_bullish):
+    """
+    Counts the closes that break each OB and finds the last one:
+    a bullish OB (support) breaks on a close below its low → Becomes Bearish Breaker Block,
+    a bearish OB (resistance) breaks on a close above its high → Becomes Bullish Breaker Block.
+    
+    Returns:
+        Tuple (n_breaks, last_break) with last_break = -1 for unbroken OBs
+    """
+    n_obs = ob_highs.shape[0]
+    n_breaks = np.zeros(n_obs, dtype=np.int64)
+    last_break = np.full(n_obs, -1, dtype=np.int64)
+    for j in range(n_obs):
+        for i in range(closes.shape[0]):
+            if (closes[i] < ob_lows[j]) if ob_is_bullish[j] else (closes[i] > ob_highs[j]):
+                n_breaks[j] += 1
+                last_break[j] = i
+    return n_breaks, last_break
+
+def detect_breaker_block(rates, recent_obs, lookback=50):
     """
     Detects Breaker Blocks - Order Blocks that failed and now act as reversal zones.
     
@@ -533,8 +919,8 @@ def detect_breaker_block(df, recent_obs, lookback=50):
     Bearish Breaker Block: Old Bullish OB broken downward → Now acts as resistance
     
     Args:
-        df: DataFrame with OHLC data
-        recent_obs: List of recently detected OBs to check for breaks
+        rates: MT5 rates array with OHLC data
+        recent_obs: Structured array of OBs (from find_historical_order_blocks) to check for breaks
         lookback: How far back to check
     
     Returns:
@@ -542,116 +928,163 @@ def detect_breaker_block(df, recent_obs, lookback=50):
     """
     breaker_blocks = []
     
-    if not recent_obs or len(recent_obs) == 0:
+    if recent_obs is None or len(recent_obs) == 0:
         return breaker_blocks
     
-    recent_candles = df.iloc[-lookback:]
-    current_price = df.iloc[-1]['close']
+    recent_candles = rates[-lookback:]
+    closes = recent_candles['close']
+    times = recent_candles['time']
+    current_price = rates['close'][-1]
+    
+    ob_highs = recent_obs['high']
+    ob_lows = recent_obs['low']
+    ob_is_bullish = recent_obs['type'] == 1
     
-    for ob in recent_obs:
-        ob_high = ob['high']
-        ob_low = ob['low']
-        ob_type = ob['type']
+    # Break count and last breaking candle per OB, in one compiled pass
+    n_breaks, last_break = _ob_breaks_nb(closes, ob_highs, ob_lows, ob_is_bullish)
+    
+    # Only OBs that failed become Breaker Blocks
+    for i in np.flatnonzero(n_breaks > 0).tolist():
+        ob_high = ob_highs[i]
+        ob_low = ob_lows[i]
         
-        # Check if OB was broken
-        if ob_type == "bullish":
-            # Bullish OB should act as support
-            # If broken downward (price closes below OB low) → Becomes Bearish Breaker Block
-            breaks = recent_candles[recent_candles['close'] < ob_low]
-            
-            if len(breaks) > 0:
-                # This OB failed - now it's a Bearish Breaker Block (resistance)
-                breaker_blocks.append({
-                    "type": "bearish",
-                    "original_ob_type": "bullish",
-                    "high": ob_high,
-                    "low": ob_low,
-                    "break_time": breaks.iloc[-1]['time'],
-                    "current_relevance": "high" if current_price < ob_high else "medium",
-                    "quality": "high" if len(breaks) >= 2 else "medium"
-                })
+        if ob_is_bullish[i]:
+            # Failed bullish OB - now a Bearish Breaker Block (resistance)
+            bb_type, original_type = "bearish", "bullish"
+            relevance = "high" if current_price < ob_high else "medium"
+        else:
+            # Failed bearish OB - now a Bullish Breaker Block (support)
+            bb_type, original_type = "bullish", "bearish"
+            relevance = "high" if current_price > ob_low else "medium"
         
-        elif ob_type == "bearish":
-            # Bearish OB should act as resistance
-            # If broken upward (price closes above OB high) → Becomes Bullish Breaker Block
-            breaks = recent_candles[recent_candles['close'] > ob_high]
-            
-            if len(breaks) > 0:
-                # This OB failed - now it's a Bullish Breaker Block (support)
-                breaker_blocks.append({
-                    "type": "bullish",
-                    "original_ob_type": "bearish",
-                    "high": ob_high,
-                    "low": ob_low,
-                    "break_time": breaks.iloc[-1]['time'],
-                    "current_relevance": "high" if current_price > ob_low else "medium",
-                    "quality": "high" if len(breaks) >= 2 else "medium"
-                })
+        breaker_blocks.append({
+            "type": bb_type,
+            "original_ob_type": original_type,
+            "high": ob_high,
+            "low": ob_low,
+            "break_time": _to_datetime(times[last_break[i]]),
+            "current_relevance": relevance,
+            "quality": "high" if n_breaks[i] >= 2 else "medium"
+        })
     
     return breaker_blocks
 
-def find_historical_order_blocks(df, lookback=50):
+@njit(cache=True)
+def _scan_order_blocks_nb(open_, high, low, close, start):
+    """
+    Scans for historical Order Blocks: an opposing candle followed, within the
+    next 5 candles, by at least 2 candles in the move direction and a close of
+    the window beyond its high/low. Candles before start are not evaluated.
+    
+    Returns:
+        Tuple of arrays (indices, is_bullish) in candle order
+    """
+    n = close.shape[0]
+    indices = np.empty(n, dtype=np.int64)
+    is_bullish = np.empty(n, dtype=np.bool_)
+    count = 0
+    
+    # Running counts of bullish/bearish candles so each window count is one subtraction
+    # (ups[k] = number of bullish candles before k)
+    ups = np.zeros(n + 1, dtype=np.int64)
+    downs = np.zeros(n + 1, dtype=np.int64)
+    for k in range(n):
+        ups[k + 1] = ups[k] + (close[k] > open_[k])
+        downs[k + 1] = downs[k] + (close[k] < open_[k])
+    
+    for i in range(max(start, 2), n - 1):
+        end = min(i + 6, n)
+        
+        # Need at least 2 candles after this one to judge the move
+        if end - (i + 1) < 2:
+            continue
+        
+        if close[i] < open_[i]:
+            # Bearish candle followed by a bullish move (Bullish OB)
+            bullish_moves = ups[end] - ups[i + 1]
+            if bullish_moves >= 2 and high[end - 1] > high[i]:
+                indices[count] = i
+                is_bullish[count] = True
+                count += 1
+        
+        elif close[i] > open_[i]:
+            # Bullish candle followed by a bearish move (Bearish OB)
+            bearish_moves = downs[end] - downs[i + 1]
+            if bearish_moves >= 2 and low[end - 1] < low[i]:
+                indices[count] = i
+                is_bullish[count] = False
+                count += 1
+    
+    return indices[:count], is_bullish[:count]
+
+# Settled Order Blocks per (cache_key, lookback): (settled_time, order_blocks)
+_OB_CACHE = {}
+
+# An OB candle's status is final once its 5-candle follow-through window has
+# closed, i.e. it sits at least this many candles before the forming one
+_OB_SETTLE_CANDLES = 7
+
+def find_historical_order_blocks(rates, lookback=50, cache_key=None):
     """
     Finds all historical Order Blocks in the lookback period.
     Used for Breaker Block detection.
     
+    With a cache_key (e.g. (symbol, timeframe)) the OBs whose follow-through
+    window had fully closed on the previous call are reused, and only the
+    newer candles are scanned.
+    
     Args:
-        df: DataFrame with OHLC data
+        rates: MT5 rates array with OHLC data
         lookback: Number of candles to analyze
+        cache_key: Optional hashable identifying the candle series
     
     Returns:
-        List of Order Blocks
+        Structured array of Order Blocks (see OB_DTYPE)
     """
-    order_blocks = []
-    recent_df = df.iloc[-lookback:]
-    
-    for i in range(2, len(recent_df) - 1):
-        candle = recent_df.iloc[i]
-        
-        # Check if it's a potential Order Block (opposing candle before a move)
-        is_bearish_candle = candle['close'] < candle['open']
-        is_bullish_candle = candle['close'] > candle['open']
-        
-        # Look at the next few candles to see if there was a strong move
-        next_candles = recent_df.iloc[i+1:min(i+6, len(recent_df))]
-        
-        if len(next_candles) < 2:
-            continue
-        
-        # Check for bullish move after bearish candle (Bullish OB)
-        if is_bearish_candle:
-            bullish_moves = sum(next_candles['close'] > next_candles['open'])
-            price_moved_up = next_candles.iloc[-1]['high'] > candle['high']
-            
-            if bullish_moves >= 2 and price_moved_up:
-                order_blocks.append({
-                    "type": "bullish",
-                    "high": candle['high'],
-                    "low": candle['low'],
-                    "open": candle['open'],
-                    "close": candle['close'],
-                    "time": candle['time'],
-                    "index": i
-                })
-        
-        # Check for bearish move after bullish candle (Bearish OB)
-        elif is_bullish_candle:
-            bearish_moves = sum(next_candles['close'] < next_candles['open'])
-            price_moved_down = next_candles.iloc[-1]['low'] < candle['low']
-            
-            if bearish_moves >= 2 and price_moved_down:
-                order_blocks.append({
-                    "type": "bearish",
-                    "high": candle['high'],
-                    "low": candle['low'],
-                    "open": candle['open'],
-                    "close": candle['close'],
-                    "time": candle['time'],
-                    "index": i
-                })
+    recent_rates = rates[-lookback:]
+    open_, high, low, close = _ohlc_rows(recent_rates)
+    times = recent_rates['time']
+    n = len(close)
+    
+    # Reuse the settled OBs still inside the window; rescan from the first unsettled candle
+    start = 0
+    settled_obs = np.empty(0, dtype=OB_DTYPE)
+    cached = _OB_CACHE.get((cache_key, lookback)) if cache_key is not None else None
+    if cached is not None and n > 2:
+        settled_time, cached_obs = cached
+        start = int(np.searchsorted(times, settled_time, side='right'))
+        settled_obs = cached_obs[cached_obs['time'] >= times[2]]
+    
+    indices, is_bullish = _scan_order_blocks_nb(open_, high, low, close, start)
+    
+    new_obs = np.empty(indices.shape[0], dtype=OB_DTYPE)
+    new_obs['type'] = is_bullish
+    new_obs['high'] = high[indices]
+    new_obs['low'] = low[indices]
+    new_obs['open'] = open_[indices]
+    new_obs['close'] = close[indices]
+    new_obs['time'] = times[indices]
+    
+    order_blocks = np.concatenate((settled_obs, new_obs))
+    order_blocks['index'] = np.searchsorted(times, order_blocks['time'])
+    
+    if cache_key is not None:
+        settle_index = n - _OB_SETTLE_CANDLES
+        if settle_index >= 0:
+            settled = order_blocks[order_blocks['index'] <= settle_index]
+            _OB_CACHE[(cache_key, lookback)] = (times[settle_index], settled)
     
     return order_blocks
 
+def scan_breaker_blocks(rates, lookback=50, cache_key=None):
+    """
+    Finds the historical Order Blocks in the lookback period and returns the
+    ones that have turned into Breaker Blocks, i.e.
+    detect_breaker_block(rates, find_historical_order_blocks(rates, lookback, cache_key), lookback).
+    """
+    historical_obs = find_historical_order_blocks(rates, lookback=lookback, cache_key=cache_key)
+    return detect_breaker_block(rates, historical_obs, lookback=lookback)
+
 def check_price_in_breaker_block(current_price, breaker_block, tolerance_pct=0.2):
     """
     Checks if current price is within or near a Breaker Block zone.
@@ -679,6 +1112,9 @@ def check_price_in_breaker_block(current_price, breaker_block, tolerance_pct=0.2
     
     return "outside"
 
+# Setup score bonus for a high-quality Breaker Block (medium ones get 10)
+MAX_BB_BONUS_SCORE = 15
+
 def enhance_setup_with_breaker_blocks(mss_type, entry_price, breaker_blocks):
     """
     Checks if the setup has Breaker Block confluence.
@@ -700,30 +1136,30 @@ def enhance_setup_with_breaker_blocks(mss_type, entry_price, breaker_blocks):
     if not matching_bbs:
         return None
     
-    # Find BBs near our entry
-    relevant_bbs = []
-    for bb in matching_bbs:
-        position = check_price_in_breaker_block(entry_price, bb)
-        if position in ["inside", "near"]:
-            relevant_bbs.append({
-                "bb": bb,
-                "position": position,
-                "quality": bb['quality']
-            })
-    
-    if not relevant_bbs:
-        return None
+    # Find BBs near our entry (same inside/near test as check_price_in_breaker_block
+    # with its default 0.2% tolerance, done for all matching BBs at once)
+    highs = np.array([bb['high'] for bb in matching_bbs], dtype=np.float64)
+    lows = np.array([bb['low'] for bb in matching_bbs], dtype=np.float64)
+    tolerance = (highs - lows) * (0.2 / 100)
     
-    # Sort by quality
-    relevant_bbs.sort(key=lambda x: 0 if x['quality'] == 'high' else 1)
+    inside = (lows <= entry_price) & (entry_price <= highs)
+    near = ((lows - tolerance) <= entry_price) & (entry_price <= (highs + tolerance))
+    relevant = inside | near
     
-    best_bb = relevant_bbs[0]
+    bb_count = int(np.count_nonzero(relevant))
+    if bb_count == 0:
+        return None
+    
+    # Best BB: the first high-quality one near entry, else the first one near entry
+    is_high = np.array([bb['quality'] == 'high' for bb in matching_bbs])
+    best = int(np.argmax(relevant * (1 + is_high)))
+    best_bb = matching_bbs[best]
     
     return {
         "has_bb": True,
-        "bb_count": len(relevant_bbs),
-        "best_bb": best_bb['bb'],
-        "position": best_bb['position'],
+        "bb_count": bb_count,
+        "best_bb": best_bb,
+        "position": "inside" if inside[best] else "near",
         "quality": best_bb['quality'],
-        "bonus_score": 15 if best_bb['quality'] == 'high' else 10
-    }
\ No newline at end of file
+        "bonus_score": MAX_BB_BONUS_SCORE if best_bb['quality'] == 'high' else 10
+    }
@@ -1,46 +1,46 @@
 import time
+import queue
+import logging
+from logging.handlers import QueueHandler, QueueListener
+import threading
 import MetaTrader5 as mt5
 from risk_manager import RiskManager
 from news_calendar import NewsCalendar
 from trade_logger import TradeLogger
-from datetime import datetime, time as dt_time, timedelta
-from config import (
-    SYMBOL, RISK_PER_TRADE, MAGIC_NUMBER, MAX_SPREAD_PIPS,
-    LONDON_SESSION_START, LONDON_SESSION_END,
-    NEW_YORK_SESSION_START, NEW_YORK_SESSION_END,
-    MAX_ORDER_AGE_MINUTES, BREAKEVEN_TRIGGER_RR,
-    ORDER_MANAGEMENT_CHECK_INTERVAL,
-    OB_LOOKBACK_CANDLES, MIN_CONFLUENCE_OVERLAP,
-    REQUIRE_CONFLUENCE, MIN_SETUP_QUALITY_SCORE,
-    ENABLE_MTF_CONFIRMATION, MTF_TIMEFRAMES,
-    REQUIRE_ALL_TF_ALIGNED, MTF_MIN_ALIGNMENT_PCT,
-    MTF_SCORE_BONUS,
-    ENABLE_BREAKER_BLOCKS, BB_LOOKBACK_CANDLES,
-    BB_SCORE_BONUS, BB_MIN_QUALITY,
-    ENABLE_TELEGRAM, TELEGRAM_NOTIFY_SIGNALS,
-    TELEGRAM_NOTIFY_TRADES, TELEGRAM_NOTIFY_FILLS,
-    TELEGRAM_NOTIFY_BREAKEVEN, TELEGRAM_NOTIFY_CLOSES,
-    TELEGRAM_NOTIFY_SKIPS, ENABLE_RISK_MANAGER, MAX_DAILY_LOSS_PCT, MAX_WEEKLY_LOSS_PCT,
-    MAX_DAILY_TRADES, RISK_STATE_FILE,
-    AVOID_HIGH_IMPACT_NEWS, NEWS_BUFFER_MINUTES, NEWS_CACHE_FILE,
-    ENABLE_TRADE_LOGGING, TRADE_DB_PATH, AUTO_CALCULATE_DAILY_PERFORMANCE
-)
+from datetime import datetime, time as dt_time
+from config import CFG
 from engine import (
-    get_ohlc_data, detect_mss_and_sl, find_fvg,
-    find_order_block, check_confluence, get_refined_entry,
-    analyze_setup_quality, get_mtf_structure, check_mtf_alignment,
-    calculate_mtf_score_bonus, find_historical_order_blocks,
-    detect_breaker_block, enhance_setup_with_breaker_blocks,
+    get_ohlc_rolling, detect_setup, check_confluence, get_refined_entry,
+    analyze_setup_quality, start_mtf_structure, check_mtf_alignment,
+    calculate_mtf_score_bonus, scan_breaker_blocks,
+    enhance_setup_with_breaker_blocks, MAX_BB_BONUS_SCORE,
     calculate_atr, calculate_volume_ratio
 )
 from pytz import timezone
 from telegram_notifier import TelegramNotifier
 from trading_functions import (
-    mt5_connect, verify_demo_account, check_spread, 
-    calculate_lot_size, execute_limit_order, is_position_open
+    mt5_connect, verify_demo_account, is_spread_ok, get_trading_snapshot,
+    calculate_lot_size, execute_limit_order, get_symbol_static
 )
 from order_manager import OrderManager
 
+log = logging.getLogger("smc")
+
+# Session windows (UTC), parsed once from the config strings
+_LONDON_START = dt_time.fromisoformat(CFG.LONDON_SESSION_START)
+_LONDON_END = dt_time.fromisoformat(CFG.LONDON_SESSION_END)
+_NY_START = dt_time.fromisoformat(CFG.NEW_YORK_SESSION_START)
+_NY_END = dt_time.fromisoformat(CFG.NEW_YORK_SESSION_END)
+
+# MTF timeframe strings from the config as MT5 constants (unknown names are skipped)
+_TF_MAP = {
+    "M5": mt5.TIMEFRAME_M5,
+    "M15": mt5.TIMEFRAME_M15,
+    "M30": mt5.TIMEFRAME_M30,
+    "H1": mt5.TIMEFRAME_H1
+}
+_MTF_TIMEFRAMES = [_TF_MAP[tf] for tf in CFG.MTF_TIMEFRAMES if tf in _TF_MAP]
+
 def is_high_impact_news_time():
     """
     Check if we're within 30 minutes of major news events.
@@ -62,23 +62,21 @@ def is_high_impact_news_time():
     
     return False
 
-def is_in_trading_session():
+def is_in_trading_session(tick=None):
     """
     Checks if the current time is within the London or New York trading sessions.
     MT5 server time is typically UTC or broker-specific, so we use UTC for consistency.
+    An already fetched tick can be passed in to avoid another terminal call.
     """
     # Get server time from MT5 (more reliable than system time)
-    server_time_struct = mt5.symbol_info_tick(SYMBOL).time
+    if tick is None:
+        tick = mt5.symbol_info_tick(CFG.SYMBOL)
+    server_time_struct = tick.time
     server_time = datetime.utcfromtimestamp(server_time_struct)
     current_time = server_time.time()
     
-    london_start = dt_time.fromisoformat(LONDON_SESSION_START)
-    london_end = dt_time.fromisoformat(LONDON_SESSION_END)
-    ny_start = dt_time.fromisoformat(NEW_YORK_SESSION_START)
-    ny_end = dt_time.fromisoformat(NEW_YORK_SESSION_END)
-
-    in_london = london_start <= current_time <= london_end
-    in_ny = ny_start <= current_time <= ny_end
+    in_london = _LONDON_START <= current_time <= _LONDON_END
+    in_ny = _NY_START <= current_time <= _NY_END
     
     return in_london or in_ny
 
@@ -113,10 +111,13 @@ def get_dynamic_risk_multiplier(setup_score, mtf_alignment=None, bb_confluence=N
     # Cap at 1.5x max
     return min(base_multiplier, 1.5)
 
-def calculate_dynamic_tp(mss_type, entry, sl, atr, setup_score):
+def calculate_dynamic_tp(mss_type, entry, sl, atr, setup_score, point):
     """
     Calculate dynamic take profit based on volatility and setup quality.
     Better setups get wider targets.
+    
+    Args:
+        point: Symbol point size (passed in so it isn't re-fetched from MT5)
     """
     risk = abs(entry - sl)
     
@@ -130,7 +131,6 @@ def calculate_dynamic_tp(mss_type, entry, sl, atr, setup_score):
     
     # Adjust for volatility
     # Higher ATR = more room to breathe
-    point = mt5.symbol_info(SYMBOL).point
     sl_in_atr = risk / (atr * point)
     
     if sl_in_atr < 1.5:  # Tight stop relative to ATR
@@ -145,31 +145,107 @@ def calculate_dynamic_tp(mss_type, entry, sl, atr, setup_score):
     
     return tp, rr_ratio
 
+def order_management_worker(stop_event, order_manager, trade_logger, telegram):
+    """
+    Runs the periodic order management (expiry, fill tracking, breakeven, cleanup)
+    every ORDER_MANAGEMENT_CHECK_INTERVAL seconds until stop_event is set.
+    Started on its own thread so it doesn't wait behind signal detection.
+    """
+    while not stop_event.wait(CFG.ORDER_MANAGEMENT_CHECK_INTERVAL):
+        try:
+            # One orders snapshot and one positions snapshot for the whole pass;
+            # a failed positions read skips it rather than acting on an empty list
+            result = order_manager.tick(CFG.SYMBOL)
+            if result is None:
+                continue
+            
+            if result['cancelled'] and CFG.ENABLE_TELEGRAM and CFG.TELEGRAM_NOTIFY_TRADES:
+                for order in result['cancelled']:
+                    telegram.notify_order_cancelled(order.ticket, "Expired")
+            
+            positions = result['positions']
+            
+            if trade_logger:
+            # Check for filled orders
+                for pos in positions:
+                    if pos.magic == CFG.MAGIC_NUMBER:
+                        # Update to active if it was pending
+                        trade_logger.update_trade_status(
+                            pos.ticket, 
+                            status='active'
+                        )
+            
+            positions_before = {pos.ticket for pos in positions}
+            if result['breakeven_moved'] > 0 and CFG.ENABLE_TELEGRAM and CFG.TELEGRAM_NOTIFY_BREAKEVEN:
+                positions_after = mt5.positions_get(symbol=CFG.SYMBOL) or []
+                for pos in positions_after:
+                    if pos.ticket in positions_before and pos.ticket in order_manager.managed_positions:
+                        telegram.notify_breakeven_moved(pos.ticket, pos.symbol, pos.sl)
+        except Exception as e:
+            log.error("❌ Order management error: %s", e)
+
+def setup_logging():
+    """
+    Routes log records through a queue: the calling thread only enqueues, and a
+    QueueListener thread formats them once and writes them to the console and
+    BOT_LOG_FILE. Returns the started listener (stop it to flush on exit).
+    """
+    formatter = logging.Formatter("%(asctime)s %(message)s")
+    handlers = [logging.StreamHandler(), logging.FileHandler(CFG.BOT_LOG_FILE, encoding="utf-8")]
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    
+    log_queue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(QueueHandler(log_queue))
+    
+    listener = QueueListener(log_queue, *handlers)
+    listener.start()
+    return listener
+
+def trade_log_worker(events, trade_logger):
+    """
+    Writes queued trade signals (log_trade_signal keyword arguments) to the
+    trade log until a None sentinel is received.
+    """
+    while True:
+        event = events.get()
+        if event is None:
+            return
+        try:
+            trade_logger.log_trade_signal(**event)
+        except Exception as e:
+            log.error("❌ Trade logging error: %s", e)
+
 def main():
     """Main function to run the trading bot."""
-    print("=" * 60)
-    print("SMC Institutional Scalper Bot v5.0 - Enhanced")
-    print("=" * 60)
+    log.info("=" * 60)
+    log.info("SMC Institutional Scalper Bot v5.0 - Enhanced")
+    log.info("=" * 60)
     
     mt5_connect()
     verify_demo_account()
     
+    # Symbol point size never changes during a session, so fetch it once
+    point = get_symbol_static(CFG.SYMBOL).point
+    
     # Get account info and display
     account_info = mt5.account_info()
 
     # 1. Risk Manager
     risk_manager = RiskManager(
-        max_daily_loss_pct=MAX_DAILY_LOSS_PCT,
-        max_weekly_loss_pct=MAX_WEEKLY_LOSS_PCT,
-        max_daily_trades=MAX_DAILY_TRADES,
-        state_file=RISK_STATE_FILE
-    ) if ENABLE_RISK_MANAGER else None
+        max_daily_loss_pct=CFG.MAX_DAILY_LOSS_PCT,
+        max_weekly_loss_pct=CFG.MAX_WEEKLY_LOSS_PCT,
+        max_daily_trades=CFG.MAX_DAILY_TRADES,
+        state_file=CFG.RISK_STATE_FILE
+    ) if CFG.ENABLE_RISK_MANAGER else None
     
     # 2. News Calendar
     news_calendar = NewsCalendar(
-        cache_file=NEWS_CACHE_FILE,
-        buffer_minutes=NEWS_BUFFER_MINUTES
-    ) if AVOID_HIGH_IMPACT_NEWS else None
+        cache_file=CFG.NEWS_CACHE_FILE,
+        buffer_minutes=CFG.NEWS_BUFFER_MINUTES
+    ) if CFG.AVOID_HIGH_IMPACT_NEWS else None
     
     # Fetch today's news events
     if news_calendar:
@@ -178,200 +254,198 @@ def main():
     
     # 3. Trade Logger
     trade_logger = TradeLogger(
-        db_path=TRADE_DB_PATH
-    ) if ENABLE_TRADE_LOGGING else None
+        db_path=CFG.TRADE_DB_PATH
+    ) if CFG.ENABLE_TRADE_LOGGING else None
     
     # Initialize Order Manager
     order_manager = OrderManager(
-        magic_number=MAGIC_NUMBER,
-        max_order_age_minutes=MAX_ORDER_AGE_MINUTES,
-        breakeven_trigger_rr=BREAKEVEN_TRIGGER_RR
+        magic_number=CFG.MAGIC_NUMBER,
+        max_order_age_minutes=CFG.MAX_ORDER_AGE_MINUTES,
+        breakeven_trigger_rr=CFG.BREAKEVEN_TRIGGER_RR
     )
     
     # Initialize Telegram Notifier
-    telegram = TelegramNotifier(enabled=ENABLE_TELEGRAM)
+    telegram = TelegramNotifier(enabled=CFG.ENABLE_TELEGRAM)
     
     # Test Telegram connection
-    if ENABLE_TELEGRAM:
+    if CFG.ENABLE_TELEGRAM:
         telegram.test_connection()
 
     # Print Risk Status
     if risk_manager:
         risk_manager.print_risk_status()
     
-    print(f"✓ Bot running on demo account")
-    print(f"✓ Account Balance: ${account_info.balance:,.2f}")
-    print(f"✓ Symbol: {SYMBOL}")
-    print(f"✓ Base Risk: {RISK_PER_TRADE * 100}% (dynamic 0.5x-1.5x)")
-    print(f"✓ Dynamic TP: 2-3R based on quality")
-    print(f"✓ MTF Confirmation: {'Enabled' if ENABLE_MTF_CONFIRMATION else 'Disabled'}")
-    print(f"✓ Breaker Blocks: {'Enabled' if ENABLE_BREAKER_BLOCKS else 'Disabled'}")
-    print("=" * 60)
+    log.info("✓ Bot running on demo account")
+    log.info("✓ Account Balance: $%s", f"{account_info.balance:,.2f}")
+    log.info("✓ Symbol: %s", CFG.SYMBOL)
+    log.info("✓ Base Risk: %s%% (dynamic 0.5x-1.5x)", CFG.RISK_PER_TRADE * 100)
+    log.info("✓ Dynamic TP: 2-3R based on quality")
+    log.info("✓ MTF Confirmation: %s", 'Enabled' if CFG.ENABLE_MTF_CONFIRMATION else 'Disabled')
+    log.info("✓ Breaker Blocks: %s", 'Enabled' if CFG.ENABLE_BREAKER_BLOCKS else 'Disabled')
+    log.info("=" * 60)
     
     # Send startup notification
-    if ENABLE_TELEGRAM:
+    if CFG.ENABLE_TELEGRAM:
         settings = {
-            'ob_lookback': OB_LOOKBACK_CANDLES,
-            'min_quality': MIN_SETUP_QUALITY_SCORE,
-            'mtf_enabled': 'Yes' if ENABLE_MTF_CONFIRMATION else 'No',
-            'bb_enabled': 'Yes' if ENABLE_BREAKER_BLOCKS else 'No'
+            'ob_lookback': CFG.OB_LOOKBACK_CANDLES,
+            'min_quality': CFG.MIN_SETUP_QUALITY_SCORE,
+            'mtf_enabled': 'Yes' if CFG.ENABLE_MTF_CONFIRMATION else 'No',
+            'bb_enabled': 'Yes' if CFG.ENABLE_BREAKER_BLOCKS else 'No'
         }
-        telegram.notify_bot_started(account_info.balance, SYMBOL, RISK_PER_TRADE, settings)
+        telegram.notify_bot_started(account_info.balance, CFG.SYMBOL, CFG.RISK_PER_TRADE, settings)
 
-    last_order_management_check = datetime.utcnow()
+    # Order management runs on its own thread, independent of candle closes
+    stop_event = threading.Event()
+    order_thread = threading.Thread(
+        target=order_management_worker,
+        args=(stop_event, order_manager, trade_logger, telegram),
+        name="order-management",
+        daemon=True
+    )
+    order_thread.start()
+    
+    # Trade signals are logged from a queue so the SQLite write doesn't delay the notifications
+    trade_log_queue = queue.SimpleQueue()
+    trade_log_thread = None
+    if trade_logger:
+        trade_log_thread = threading.Thread(
+            target=trade_log_worker,
+            args=(trade_log_queue, trade_logger),
+            name="trade-log",
+            daemon=True
+        )
+        trade_log_thread.start()
+    
+    last_bar_time = None
     
     try:
         while True:
-            # Calculate time to next M1 candle close
-            now = datetime.utcnow()
-            next_candle = (now + timedelta(minutes=1)).replace(second=0, microsecond=0)
-            sleep_seconds = (next_candle - now).total_seconds()
-            
-            # Periodic order management
-            time_since_last_check = (now - last_order_management_check).total_seconds()
-            if time_since_last_check >= ORDER_MANAGEMENT_CHECK_INTERVAL:
-                pending_orders_before = order_manager.get_pending_orders(SYMBOL)
-                cancelled = order_manager.cancel_old_orders(SYMBOL)
-                if cancelled > 0 and ENABLE_TELEGRAM and TELEGRAM_NOTIFY_TRADES:
-                    for order in pending_orders_before[:cancelled]:
-                        telegram.notify_order_cancelled(order.ticket, "Expired")
-
-                if trade_logger:
-                # Check for filled orders
-                    positions = mt5.positions_get(symbol=SYMBOL)
-                    if positions:
-                        for pos in positions:
-                            if pos.magic == MAGIC_NUMBER:
-                                # Update to active if it was pending
-                                trade_logger.update_trade_status(
-                                    pos.ticket, 
-                                    status='active'
-                                )
-                
-                positions_before = {pos.ticket for pos in mt5.positions_get(symbol=SYMBOL) or []}
-                modified = order_manager.manage_breakeven(SYMBOL)
-                if modified > 0 and ENABLE_TELEGRAM and TELEGRAM_NOTIFY_BREAKEVEN:
-                    positions_after = mt5.positions_get(symbol=SYMBOL) or []
-                    for pos in positions_after:
-                        if pos.ticket in positions_before and pos.ticket in order_manager.managed_positions:
-                            telegram.notify_breakeven_moved(pos.ticket, pos.symbol, pos.sl)
-                
-                order_manager.cleanup_closed_positions()
-                last_order_management_check = now
-            
-            # Sleep until next candle
-            time.sleep(max(1, sleep_seconds))
+            # Wait for a new M1 candle to close on the server clock
+            rates = get_ohlc_rolling(CFG.SYMBOL, mt5.TIMEFRAME_M1, count=100)
+            if rates is None or len(rates) < 2 or rates[-2]['time'] == last_bar_time:
+                time.sleep(CFG.BAR_POLL_INTERVAL)
+                continue
+            last_bar_time = rates[-2]['time']
+            # Server-clock minute of the bar now forming, from the fetched bar times
+            bar_minute = int(rates[-1]['time'] // 60 % 60)
             
             # === PRE-TRADE FILTERS ===
 
-            # 0. RISK MANAGER CHECK
+            # Update high watermarks periodically
             if risk_manager:
-                can_trade, reason = risk_manager.can_trade()
-                if not can_trade:
-                    print(f"🛑 Trading suspended: {reason}")
-                    if telegram:
-                        telegram.send_message(f"🛑 <b>Trading Suspended</b>\n\n{reason}")
-                    
-                    # Sleep for 5 minutes before checking again
-                    time.sleep(300)
-                    continue
-                
-                # Update high watermarks periodically
                 risk_manager.update_high_watermarks()
             
+            # Positions, orders and tick for the filters below, fetched together
+            # (cheapest filters first; the risk and news checks only run if these pass)
+            positions, orders, tick = get_trading_snapshot(CFG.SYMBOL)
+            if tick is None:
+                continue
+            
+            # A failed read must not look like "no open positions"
+            if positions is None or orders is None or order_manager.halted:
+                continue
+            
             # 1. Check trading session
-            if not is_in_trading_session():
+            if not is_in_trading_session(tick):
                 continue
 
             # 2. Check for existing positions/orders
-            if is_position_open(SYMBOL):
+            if positions:
                 continue
             
-            pending_orders = order_manager.get_pending_orders(SYMBOL)
-            if len(pending_orders) > 0:
+            if any(order.magic == CFG.MAGIC_NUMBER for order in orders):
                 continue
             
             # 3. Spread filter
-            if not check_spread(SYMBOL):
+            if not is_spread_ok(tick, point):
                 continue
             
-            # 4. High-impact news filter (UPDATED)
+            # 4. RISK MANAGER CHECK
+            if risk_manager:
+                can_trade, reason = risk_manager.can_trade()
+                if not can_trade:
+                    log.warning("🛑 Trading suspended: %s", reason)
+                    if telegram:
+                        telegram.send_message(f"🛑 <b>Trading Suspended</b>\n\n{reason}")
+                    
+                    # Sleep for 5 minutes before checking again, but not past the
+                    # daily/weekly reset that may lift the lock
+                    time.sleep(min(300, risk_manager.seconds_until_reset() + 1))
+                    continue
+            
+            # 5. High-impact news filter (UPDATED)
             if news_calendar:
                 is_news, reason = news_calendar.is_high_impact_news_time()
                 if is_news:
-                    print(f"⚠️  High-impact news: {reason}")
-                    if ENABLE_TELEGRAM and TELEGRAM_NOTIFY_SKIPS:
+                    log.info("⚠️  High-impact news: %s", reason)
+                    if CFG.ENABLE_TELEGRAM and CFG.TELEGRAM_NOTIFY_SKIPS:
                         telegram.notify_signal_skipped("High-impact news", reason)
                     continue
 
             # === MARKET ANALYSIS ===
             
-            # Fetch OHLC data
-            df = get_ohlc_data(SYMBOL, mt5.TIMEFRAME_M1, count=100)
+            # Start the higher timeframe fetches now so they overlap the M1 analysis
+            mtf_pending = start_mtf_structure(CFG.SYMBOL, timeframes=_MTF_TIMEFRAMES) \
+                if CFG.ENABLE_MTF_CONFIRMATION else None
             
             # Calculate ATR from H1 timeframe for better stability
-            atr = calculate_atr(SYMBOL, period=14, timeframe=mt5.TIMEFRAME_H1)
-            point = mt5.symbol_info(SYMBOL).point
+            atr = calculate_atr(CFG.SYMBOL, period=14, timeframe=mt5.TIMEFRAME_H1)
             atr_pips = atr / (point * 10)
             
             # Volume filter
-            volume_ratio = calculate_volume_ratio(df)
+            volume_ratio = calculate_volume_ratio(rates)
             
             # Skip in extremely low volatility (less than 3 pips ATR)
             if atr_pips < 3.0:
                 # Only print this message every 30 minutes to reduce noise
-                if int(now.minute) % 30 == 0:
-                    print(f"⚠️  ATR too low ({atr_pips:.1f} pips). Market too quiet.")
+                if bar_minute % 30 == 0:
+                    log.info("⚠️  ATR too low (%.1f pips). Market too quiet.", atr_pips)
                 continue
             
             # Skip in abnormally low volume
             if volume_ratio < 0.5:
                 continue
             
-            # Detect MSS
-            mss_type, stop_loss = detect_mss_and_sl(df)
+            # Detect MSS, Order Block and FVG in a single pass
+            mss_type, stop_loss, order_block, fvg = detect_setup(rates, ob_lookback=CFG.OB_LOOKBACK_CANDLES)
             
             if not mss_type:
                 continue
             
-            # Find Order Block
-            order_block = find_order_block(df, mss_type, lookback=OB_LOOKBACK_CANDLES)
-            
-            # Find FVG
-            fvg = find_fvg(df)
-            
-            # Check confluence
-            confluence = check_confluence(order_block, fvg, min_overlap_pct=MIN_CONFLUENCE_OVERLAP)
-            
             # === MULTI-TIMEFRAME ANALYSIS ===
+            # Runs before the zone analysis: it only needs the MSS direction
             mtf_alignment = None
-            if ENABLE_MTF_CONFIRMATION:
-                # Convert timeframe strings to MT5 constants
-                tf_map = {
-                    "M5": mt5.TIMEFRAME_M5,
-                    "M15": mt5.TIMEFRAME_M15,
-                    "M30": mt5.TIMEFRAME_M30,
-                    "H1": mt5.TIMEFRAME_H1
-                }
-                mtf_timeframes = [tf_map[tf] for tf in MTF_TIMEFRAMES if tf in tf_map]
-                
-                mtf_structure = get_mtf_structure(SYMBOL, timeframes=mtf_timeframes)
+            if CFG.ENABLE_MTF_CONFIRMATION:
+                mtf_structure = mtf_pending()
                 mtf_alignment = check_mtf_alignment(mss_type, mtf_structure, 
-                                                     require_all_aligned=REQUIRE_ALL_TF_ALIGNED)
+                                                     require_all_aligned=CFG.REQUIRE_ALL_TF_ALIGNED)
                 
                 # Filter out if MTF is misaligned
-                if mtf_alignment['alignment_pct'] < MTF_MIN_ALIGNMENT_PCT:
-                    print(f"⚠️  MTF misaligned ({mtf_alignment['alignment_pct']:.0f}%). Skipping.")
-                    if ENABLE_TELEGRAM and TELEGRAM_NOTIFY_SKIPS:
+                if mtf_alignment['alignment_pct'] < CFG.MTF_MIN_ALIGNMENT_PCT:
+                    log.info("⚠️  MTF misaligned (%.0f%%). Skipping.", mtf_alignment['alignment_pct'])
+                    if CFG.ENABLE_TELEGRAM and CFG.TELEGRAM_NOTIFY_SKIPS:
                         telegram.notify_signal_skipped("MTF misalignment", 
                                                        f"{mtf_alignment['alignment_pct']:.0f}%")
                     continue
             
+            # Check confluence
+            confluence = check_confluence(order_block, fvg, min_overlap_pct=CFG.MIN_CONFLUENCE_OVERLAP)
+            
+            # === SETUP QUALITY ANALYSIS ===
+            mtf_bonus = calculate_mtf_score_bonus(mtf_alignment) if mtf_alignment and CFG.MTF_SCORE_BONUS else 0
+            max_bb_bonus = MAX_BB_BONUS_SCORE if CFG.ENABLE_BREAKER_BLOCKS and CFG.BB_SCORE_BONUS else 0
+            
+            # The bonuses count towards the threshold, so the base score only needs the rest
+            setup_analysis = analyze_setup_quality(mss_type, order_block, fvg, confluence,
+                                                   min_required=CFG.MIN_SETUP_QUALITY_SCORE - mtf_bonus - max_bb_bonus)
+            
             # === BREAKER BLOCK ANALYSIS ===
+            # Skipped when even the largest BB bonus couldn't lift the setup over the threshold
             bb_confluence = None
-            if ENABLE_BREAKER_BLOCKS:
-                historical_obs = find_historical_order_blocks(df, lookback=BB_LOOKBACK_CANDLES)
-                breaker_blocks = detect_breaker_block(df, historical_obs, lookback=BB_LOOKBACK_CANDLES)
+            if CFG.ENABLE_BREAKER_BLOCKS and \
+                    setup_analysis['score'] + mtf_bonus + max_bb_bonus >= CFG.MIN_SETUP_QUALITY_SCORE:
+                breaker_blocks = scan_breaker_blocks(rates, lookback=CFG.BB_LOOKBACK_CANDLES,
+                                                     cache_key=(CFG.SYMBOL, mt5.TIMEFRAME_M1))
                 
                 if breaker_blocks:
                     # Get refined entry first
@@ -380,55 +454,52 @@ def main():
                         bb_confluence = enhance_setup_with_breaker_blocks(mss_type, entry_price, breaker_blocks)
                         
                         if bb_confluence and bb_confluence.get('quality') == 'high':
-                            print(f"🔄 High-quality Breaker Block detected!")
-                            if ENABLE_TELEGRAM:
+                            log.info("🔄 High-quality Breaker Block detected!")
+                            if CFG.ENABLE_TELEGRAM:
                                 bb = bb_confluence['best_bb']
                                 telegram.notify_breaker_block_detected(
                                     bb['type'], bb['high'], bb['low'], bb['quality']
                                 )
             
-            # === SETUP QUALITY ANALYSIS ===
-            setup_analysis = analyze_setup_quality(mss_type, order_block, fvg, confluence)
+            bb_bonus = bb_confluence.get('bonus_score', 0) if bb_confluence and CFG.BB_SCORE_BONUS else 0
             
             # Add MTF bonus
-            if mtf_alignment and MTF_SCORE_BONUS:
-                mtf_bonus = calculate_mtf_score_bonus(mtf_alignment)
+            if mtf_bonus:
                 setup_analysis['score'] += mtf_bonus
                 setup_analysis['factors'].append(f"✓ MTF Bonus: +{mtf_bonus} pts")
             
             # Add BB bonus
-            if bb_confluence and BB_SCORE_BONUS:
-                bb_bonus = bb_confluence.get('bonus_score', 0)
+            if bb_bonus:
                 setup_analysis['score'] += bb_bonus
                 setup_analysis['factors'].append(f"✓ BB Bonus: +{bb_bonus} pts")
             
             # Filter by minimum quality
-            if setup_analysis['score'] < MIN_SETUP_QUALITY_SCORE:
-                print(f"⚠️  Setup quality too low ({setup_analysis['score']}/100). Skipping.")
+            if setup_analysis['score'] < CFG.MIN_SETUP_QUALITY_SCORE:
+                log.info("⚠️  Setup quality too low (%d/100). Skipping.", setup_analysis['score'])
                 continue
             
             # Confluence requirement
-            if REQUIRE_CONFLUENCE and not confluence:
-                print(f"⚠️  No OB+FVG confluence. Skipping.")
+            if CFG.REQUIRE_CONFLUENCE and not confluence:
+                log.info("⚠️  No OB+FVG confluence. Skipping.")
                 continue
             
             # === VALID SETUP DETECTED ===
-            print(f"\n{'='*60}")
-            print(f"🎯 HIGH-QUALITY SIGNAL: {mss_type.upper()} MSS")
-            print(f"{'='*60}")
-            print(f"📊 Setup Score: {setup_analysis['quality']} ({setup_analysis['score']}/100)")
-            print(f"📈 ATR: {atr_pips:.1f} pips")
-            print(f"📊 Volume: {volume_ratio:.2f}x average")
+            log.info("=" * 60)
+            log.info("🎯 HIGH-QUALITY SIGNAL: %s MSS", mss_type.upper())
+            log.info("=" * 60)
+            log.info("📊 Setup Score: %s (%d/100)", setup_analysis['quality'], setup_analysis['score'])
+            log.info("📈 ATR: %.1f pips", atr_pips)
+            log.info("📊 Volume: %.2fx average", volume_ratio)
             
             if mtf_alignment:
-                print(f"🔄 MTF: {mtf_alignment['strength']} ({mtf_alignment['alignment_pct']:.0f}%)")
+                log.info("🔄 MTF: %s (%.0f%%)", mtf_alignment['strength'], mtf_alignment['alignment_pct'])
             
             for factor in setup_analysis['factors']:
-                print(f"   {factor}")
-            print(f"{'='*60}")
+                log.info("   %s", factor)
+            log.info("=" * 60)
             
             # Notify signal
-            if ENABLE_TELEGRAM and TELEGRAM_NOTIFY_SIGNALS:
+            if CFG.ENABLE_TELEGRAM and CFG.TELEGRAM_NOTIFY_SIGNALS:
                 telegram.notify_signal_detected(
                     mss_type, 
                     setup_analysis['score'], 
@@ -442,12 +513,12 @@ def main():
             entry_price = get_refined_entry(order_block, fvg, confluence)
             
             if entry_price is None:
-                print(f"❌ Could not determine entry. Skipping.")
+                log.error("❌ Could not determine entry. Skipping.")
                 continue
             
             # Calculate dynamic TP
             take_profit, rr_ratio = calculate_dynamic_tp(mss_type, entry_price, stop_loss, 
-                                                          atr, setup_analysis['score'])
+                                                          atr, setup_analysis['score'], point)
             
             # Calculate dynamic lot size
             sl_pips = abs(entry_price - stop_loss) / point
@@ -458,43 +529,43 @@ def main():
                 bb_confluence
             )
             
-            adjusted_risk = RISK_PER_TRADE * risk_multiplier
+            adjusted_risk = CFG.RISK_PER_TRADE * risk_multiplier
             
             account_info = mt5.account_info()
             lot_size = calculate_lot_size(
                 account_info.balance, 
                 adjusted_risk,
                 sl_pips, 
-                SYMBOL
+                CFG.SYMBOL
             )
             
             tp_pips = abs(take_profit - entry_price) / point
             risk_amount = account_info.balance * adjusted_risk
             potential_profit = risk_amount * rr_ratio
 
-            print(f"💰 Trade Details:")
-            print(f"   Entry: {entry_price:.5f}")
-            print(f"   SL: {stop_loss:.5f} ({sl_pips:.1f} pips)")
-            print(f"   TP: {take_profit:.5f} ({tp_pips:.1f} pips)")
-            print(f"   R:R: 1:{rr_ratio:.1f}")
-            print(f"   Lot Size: {lot_size}")
-            print(f"   Risk: ${risk_amount:.2f} ({adjusted_risk*100:.2f}%)")
-            print(f"   Potential: ${potential_profit:.2f}")
+            log.info("💰 Trade Details:")
+            log.info("   Entry: %.5f", entry_price)
+            log.info("   SL: %.5f (%.1f pips)", stop_loss, sl_pips)
+            log.info("   TP: %.5f (%.1f pips)", take_profit, tp_pips)
+            log.info("   R:R: 1:%.1f", rr_ratio)
+            log.info("   Lot Size: %s", lot_size)
+            log.info("   Risk: $%.2f (%.2f%%)", risk_amount, adjusted_risk * 100)
+            log.info("   Potential: $%.2f", potential_profit)
 
             # Execute Trade
             order_type = mt5.ORDER_TYPE_BUY_LIMIT if mss_type == "bullish" else mt5.ORDER_TYPE_SELL_LIMIT
             result = execute_limit_order(
                 order_type,
-                SYMBOL, 
+                CFG.SYMBOL, 
                 lot_size, 
                 entry_price, 
                 stop_loss, 
                 take_profit, 
-                MAGIC_NUMBER
+                CFG.MAGIC_NUMBER
             )
             
             if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                print(f"✅ Order placed successfully (Ticket: #{result.order})")
+                log.info("✅ Order placed successfully (Ticket: #%s)", result.order)
 
             if trade_logger:
             # Prepare setup analysis for logging
@@ -507,9 +578,10 @@ def main():
                     'confluence_quality': confluence.get('quality', None) if confluence else None
                 }
                 
-                trade_logger.log_trade_signal(
+                # Written to the database by trade_log_worker, off the execution path
+                trade_log_queue.put_nowait(dict(
                     ticket_number=result.order,
-                    symbol=SYMBOL,
+                    symbol=CFG.SYMBOL,
                     direction=mss_type,
                     entry_price=entry_price,
                     stop_loss=stop_loss,
@@ -525,53 +597,68 @@ def main():
                     atr_pips=atr_pips,
                     volume_ratio=volume_ratio,
                     spread_pips=0  # Calculate if needed
-                )
+                ))
         
             # ============ Record Trade in Risk Manager (NEW) ============
             if risk_manager:
                 risk_manager.record_trade()
                 
-                if ENABLE_TELEGRAM and TELEGRAM_NOTIFY_TRADES:
+                if CFG.ENABLE_TELEGRAM and CFG.TELEGRAM_NOTIFY_TRADES:
                     telegram.notify_trade_placed(
-                        order_type, SYMBOL, entry_price, stop_loss, take_profit,
+                        order_type, CFG.SYMBOL, entry_price, stop_loss, take_profit,
                         lot_size, risk_amount, potential_profit, result.order
                     )
             else:
-                print(f"❌ Order failed: {result.comment if result else 'Unknown error'}")
+                log.error("❌ Order failed: %s", result.comment if result else 'Unknown error')
             
-            print(f"{'='*60}\n")
+            log.info("=" * 60)
 
     except KeyboardInterrupt:
-        print("\n\n🛑 Bot stopped by user.")
+        log.info("🛑 Bot stopped by user.")
     except Exception as e:
-        print(f"\n❌ Unexpected error: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("❌ Unexpected error: %s", e)
         
-        if ENABLE_TELEGRAM:
+        if CFG.ENABLE_TELEGRAM:
             telegram.notify_error(str(e))
     finally:
-        print("\n" + "=" * 60)
-        print("📊 Final Status Report")
-        print("=" * 60)
-        status = order_manager.get_status_report(SYMBOL)
-        print(f"Pending Orders: {status['pending_orders']}")
-        print(f"Open Positions: {status['open_positions']}")
+        stop_event.set()
+        order_thread.join(timeout=5)
+        if trade_log_thread:
+            # Drain the pending signals before the performance report reads the database
+            trade_log_queue.put(None)
+            trade_log_thread.join(timeout=5)
+        
+        log.info("=" * 60)
+        log.info("📊 Final Status Report")
+        log.info("=" * 60)
+        status = order_manager.get_status_report(CFG.SYMBOL)
+        log.info("Pending Orders: %s", status['pending_orders'])
+        log.info("Open Positions: %s", status['open_positions'])
         if risk_manager:
          risk_manager.print_risk_status()
+         risk_manager.flush_state(force=True)
     
         # Trade Performance
         if trade_logger:
-            print("\n" + "=" * 60)
+            log.info("=" * 60)
             trade_logger.print_performance_report(days=7)
             
             # Calculate today's performance
-            if AUTO_CALCULATE_DAILY_PERFORMANCE:
+            if CFG.AUTO_CALCULATE_DAILY_PERFORMANCE:
                 trade_logger.calculate_daily_performance()
-        print("=" * 60)
+            
+            trade_logger.close()
+        log.info("=" * 60)
+        
+        # Deliver the notifications still queued (e.g. an error report) before exiting
+        telegram.close()
         
         mt5.shutdown()
-        print("✓ MetaTrader5 connection closed.")
+        log.info("✓ MetaTrader5 connection closed.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    log_listener = setup_logging()
+    try:
+        main()
+    finally:
+        log_listener.stop()
\ No newline at end of file
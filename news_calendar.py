@@ -1,8 +1,10 @@
 import json
 import os
-from datetime import datetime, time as dt_time, timedelta
+import time
+import numpy as np
+from datetime import datetime, time as dt_time, timezone
 import requests
-from config import NEWS_BUFFER_MINUTES, MANUAL_NEWS_TIMES
+from config import CFG
 
 class NewsCalendar:
     """
@@ -14,6 +16,10 @@ class NewsCalendar:
         self.cache_file = cache_file
         self.buffer_minutes = buffer_minutes
         self.news_events = []
+        # Buffered high-impact windows in POSIX seconds, sorted by end (see _build_windows)
+        self._window_ends = np.empty(0)
+        self._window_min_starts = np.empty(0)
+        self._window_events = []
         self.last_refresh = None
 
     def force_refresh(self):
@@ -34,7 +40,7 @@ class NewsCalendar:
         self.news_events = []
         today = datetime.utcnow().date()
 
-        for start_str, end_str in MANUAL_NEWS_TIMES:
+        for start_str, end_str in CFG.MANUAL_NEWS_TIMES:
             start_time = dt_time.fromisoformat(start_str)
             end_time = dt_time.fromisoformat(end_str)
 
@@ -48,6 +54,36 @@ class NewsCalendar:
             }
             self.news_events.append(event)
 
+        self._build_windows()
+
+    def _build_windows(self):
+        """
+        Precompute the buffered high-impact windows as POSIX seconds, sorted by
+        end time. For each position, _window_min_starts holds the earliest start
+        among that window and all later-ending ones, and _window_events the
+        event it belongs to, so a lookup is one searchsorted.
+        """
+        buffer_seconds = self.buffer_minutes * 60
+        events = [event for event in self.news_events if event['impact'] == 'high']
+        starts = np.array([event['start_utc'].replace(tzinfo=timezone.utc).timestamp() - buffer_seconds
+                           for event in events], dtype=np.float64)
+        ends = np.array([event['end_utc'].replace(tzinfo=timezone.utc).timestamp() + buffer_seconds
+                         for event in events], dtype=np.float64)
+
+        order = np.argsort(ends, kind='stable')
+        self._window_ends = ends[order]
+        self._window_min_starts = np.empty(len(order))
+        self._window_events = [None] * len(order)
+
+        # Suffix minimum of the start times, remembering which event it came from
+        min_start, min_event = np.inf, None
+        for pos in range(len(order) - 1, -1, -1):
+            k = order[pos]
+            if starts[k] <= min_start:
+                min_start, min_event = starts[k], events[k]
+            self._window_min_starts[pos] = min_start
+            self._window_events[pos] = min_event
+
     def print_todays_events(self):
         """Print today's news events."""
         if not self.news_events:
@@ -68,19 +104,15 @@ class NewsCalendar:
         if not self.news_events:
             return False, "No news data"
 
-        now = datetime.utcnow()
-        buffer_delta = timedelta(minutes=self.buffer_minutes)
-
-        for event in self.news_events:
-            if event['impact'] != 'high':
-                continue
-
-            start_buffer = event['start_utc'] - buffer_delta
-            end_buffer = event['end_utc'] + buffer_delta
+        now = time.time()
 
-            if start_buffer <= now <= end_buffer:
-                reason = f"{event['title']} ({event['start_utc'].strftime('%H:%M')}-{event['end_utc'].strftime('%H:%M')} UTC)"
-                return True, reason
+        # First window that hasn't ended yet; any of it or the later-ending ones
+        # covers now if the earliest of their starts has passed
+        i = np.searchsorted(self._window_ends, now, side='left')
+        if i < len(self._window_ends) and self._window_min_starts[i] <= now:
+            event = self._window_events[i]
+            reason = f"{event['title']} ({event['start_utc'].strftime('%H:%M')}-{event['end_utc'].strftime('%H:%M')} UTC)"
+            return True, reason
 
         return False, "No high-impact news"
 
@@ -113,6 +145,7 @@ class NewsCalendar:
                 event['start_utc'] = datetime.fromisoformat(event['start_utc'])
                 event['end_utc'] = datetime.fromisoformat(event['end_utc'])
 
+            self._build_windows()
             return True
         except Exception as e:
             print(f"⚠️  Failed to load cache: {e}")
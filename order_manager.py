@@ -1,9 +1,13 @@
 import MetaTrader5 as mt5
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 class OrderManager:
     """Manages pending orders and open positions with advanced logic."""
     
+    # Consecutive failed position reads before trading is halted
+    READ_FAILURE_LIMIT = 5
+    
     def __init__(self, magic_number, max_order_age_minutes=30, breakeven_trigger_rr=1.0):
         """
         Initialize Order Manager.
@@ -16,7 +20,34 @@ class OrderManager:
         self.magic_number = magic_number
         self.max_order_age_minutes = max_order_age_minutes
         self.breakeven_trigger_rr = breakeven_trigger_rr
-        self.managed_positions = {}  # Track positions we've already modified
+        self.managed_positions = {}  # Track positions we've already modified (ticket -> symbol)
+        self._read_fail_count = 0
+        self.halted = False  # Set while MT5 position reads keep failing
+    
+    def get_positions(self, symbol=None):
+        """
+        Fetch open positions, telling a failed read apart from an empty account.
+        
+        Returns:
+            Tuple of positions (empty if none are open), or None if the read failed.
+            After READ_FAILURE_LIMIT consecutive failures, halted is set until a
+            read succeeds again.
+        """
+        positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+        
+        if positions is None:
+            self._read_fail_count += 1
+            if self._read_fail_count >= self.READ_FAILURE_LIMIT and not self.halted:
+                self.halted = True
+                print(f"🛑 CRITICAL: {self._read_fail_count} consecutive position reads failed "
+                      f"({mt5.last_error()}). Trading halted until MT5 responds.")
+            return None
+        
+        if self.halted:
+            print("✓ Position reads recovered, trading resumed")
+        self._read_fail_count = 0
+        self.halted = False
+        return positions
     
     def get_pending_orders(self, symbol=None):
         """Retrieve all pending orders for this bot."""
@@ -27,9 +58,12 @@ class OrderManager:
     
     def cancel_old_orders(self, symbol=None):
         """Cancel pending orders that are older than max_order_age_minutes."""
-        pending_orders = self.get_pending_orders(symbol)
+        return len(self._cancel_expired(self.get_pending_orders(symbol)))
+    
+    def _cancel_expired(self, pending_orders):
+        """Cancel the expired orders among pending_orders and return the ones cancelled."""
         current_time = datetime.now()
-        cancelled_count = 0
+        cancelled = []
         
         for order in pending_orders:
             order_time = datetime.fromtimestamp(order.time_setup)
@@ -39,11 +73,11 @@ class OrderManager:
                 result = self._cancel_order(order.ticket)
                 if result and result.retcode == mt5.TRADE_RETCODE_DONE:
                     print(f"✓ Cancelled old order #{order.ticket} (age: {order_age:.1f} min)")
-                    cancelled_count += 1
+                    cancelled.append(order)
                 else:
                     print(f"✗ Failed to cancel order #{order.ticket}: {result.comment if result else 'Unknown error'}")
         
-        return cancelled_count
+        return cancelled
     
     def _cancel_order(self, ticket):
         """Cancel a specific order by ticket."""
@@ -54,12 +88,15 @@ class OrderManager:
         result = mt5.order_send(request)
         return result
     
-    def manage_breakeven(self, symbol=None):
+    def manage_breakeven(self, symbol=None, positions=None):
         """
         Move stop loss to breakeven for positions that have reached the breakeven trigger.
+        A positions snapshot the caller already fetched for the same symbol can be
+        passed in to skip the positions_get call.
         Returns the number of positions modified.
         """
-        positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+        if positions is None:
+            positions = self.get_positions(symbol)
         if positions is None:
             return 0
         
@@ -67,13 +104,23 @@ class OrderManager:
         positions = [pos for pos in positions if pos.magic == self.magic_number]
         modified_count = 0
         
+        # The snapshot already tells which managed tickets are still open
+        self.cleanup_closed_positions(known_open_tickets={pos.ticket for pos in positions}, symbol=symbol)
+        
+        # One symbol_info call per symbol, shared by all its positions
+        symbol_infos = {}
+        # (ticket, symbol, new_sl, tp, rr) for every position due a breakeven move
+        pending = []
+        
         for position in positions:
             # Skip if already managed
             if position.ticket in self.managed_positions:
                 continue
             
             # Get current price
-            symbol_info = mt5.symbol_info(position.symbol)
+            if position.symbol not in symbol_infos:
+                symbol_infos[position.symbol] = mt5.symbol_info(position.symbol)
+            symbol_info = symbol_infos[position.symbol]
             if symbol_info is None:
                 continue
             
@@ -111,18 +158,51 @@ class OrderManager:
                     # Only modify if new SL is better than current SL
                     if (position.type == mt5.POSITION_TYPE_BUY and new_sl > stop_loss) or \
                        (position.type == mt5.POSITION_TYPE_SELL and new_sl < stop_loss):
-                        
-                        result = self._modify_position_sl(position.ticket, position.symbol, new_sl, take_profit)
-                        
-                        if result and result.retcode == mt5.TRADE_RETCODE_DONE:
-                            print(f"✓ Moved position #{position.ticket} to breakeven (RR: {current_rr:.2f})")
-                            self.managed_positions[position.ticket] = True
-                            modified_count += 1
-                        else:
-                            print(f"✗ Failed to modify position #{position.ticket}: {result.comment if result else 'Unknown error'}")
+                        pending.append((position.ticket, position.symbol, new_sl, take_profit, current_rr))
+        
+        if not pending:
+            return 0
+        
+        # Send the modifications concurrently so N positions cost one round trip
+        # instead of N; a single modification skips the thread pool entirely
+        if len(pending) == 1:
+            results = [self._modify_position_sl(*pending[0][:4])]
+        else:
+            with ThreadPoolExecutor(max_workers=min(8, len(pending))) as executor:
+                results = list(executor.map(lambda args: self._modify_position_sl(*args[:4]), pending))
+        
+        for (ticket, position_symbol, _, _, current_rr), result in zip(pending, results):
+            if result and result.retcode == mt5.TRADE_RETCODE_DONE:
+                print(f"✓ Moved position #{ticket} to breakeven (RR: {current_rr:.2f})")
+                self.managed_positions[ticket] = position_symbol
+                modified_count += 1
+            else:
+                print(f"✗ Failed to modify position #{ticket}: {result.comment if result else 'Unknown error'}")
         
         return modified_count
     
+    def tick(self, symbol=None):
+        """
+        Run one order-management pass (order expiry, breakeven, managed-ticket
+        pruning) from a single orders snapshot and a single positions snapshot.
+        
+        Returns:
+            Dictionary with 'cancelled' (orders cancelled as expired), 'positions'
+            (the positions snapshot) and 'breakeven_moved' (positions modified),
+            or None if the positions read failed
+        """
+        cancelled = self._cancel_expired(self.get_pending_orders(symbol))
+        
+        positions = self.get_positions(symbol)
+        if positions is None:
+            return None
+        
+        return {
+            "cancelled": cancelled,
+            "positions": positions,
+            "breakeven_moved": self.manage_breakeven(symbol, positions=positions)
+        }
+    
     def _modify_position_sl(self, ticket, symbol, new_sl, tp):
         """Modify the stop loss of an open position."""
         request = {
@@ -135,10 +215,25 @@ class OrderManager:
         result = mt5.order_send(request)
         return result
     
-    def cleanup_closed_positions(self):
-        """Remove closed positions from the managed list."""
-        open_tickets = {pos.ticket for pos in mt5.positions_get() or []}
-        closed_tickets = [ticket for ticket in self.managed_positions.keys() if ticket not in open_tickets]
+    def cleanup_closed_positions(self, known_open_tickets=None, symbol=None):
+        """
+        Remove closed positions from the managed list.
+        
+        Args:
+            known_open_tickets: Open tickets from a positions snapshot the caller
+                already holds; fetched (filtered by magic number) if None
+            symbol: Symbol the snapshot was taken for; only managed tickets on
+                it are pruned. None means the snapshot covers every symbol
+        """
+        if known_open_tickets is None:
+            # Never prune from a failed read: that would forget still-open positions
+            positions = self.get_positions(symbol)
+            if positions is None:
+                return 0
+            known_open_tickets = {pos.ticket for pos in positions if pos.magic == self.magic_number}
+        
+        closed_tickets = [ticket for ticket, ticket_symbol in self.managed_positions.items()
+                          if ticket not in known_open_tickets and (symbol is None or ticket_symbol == symbol)]
         
         for ticket in closed_tickets:
             del self.managed_positions[ticket]
@@ -148,7 +243,7 @@ class OrderManager:
     def get_status_report(self, symbol=None):
         """Generate a status report of orders and positions."""
         pending = self.get_pending_orders(symbol)
-        positions = mt5.positions_get(symbol=symbol) if symbol else mt5.positions_get()
+        positions = self.get_positions(symbol)
         positions = [pos for pos in (positions or []) if pos.magic == self.magic_number]
         
         report = {
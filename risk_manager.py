@@ -2,6 +2,24 @@ import MetaTrader5 as mt5
 from datetime import datetime, timedelta
 import json
 import os
+import time
+
+try:
+    import orjson
+except ImportError:  # optional: faster state (de)serialization
+    orjson = None
+
+def _dump_state(state, f):
+    """Serialize state to a binary file object."""
+    if orjson is not None:
+        f.write(orjson.dumps(state, option=orjson.OPT_INDENT_2))
+    else:
+        f.write(json.dumps(state, indent=2).encode())
+
+def _load_state_file(f):
+    """Deserialize state from a binary file object."""
+    data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
 class RiskManager:
     """
@@ -9,6 +27,11 @@ class RiskManager:
     Prevents catastrophic losses by implementing circuit breakers.
     """
     
+    # Minimum seconds between non-critical state writes (watermark updates)
+    FLUSH_INTERVAL = 2.0
+    # How long one account_info fetch is reused across calls within a tick
+    ACCOUNT_INFO_TTL = 0.25
+    
     def __init__(self, max_daily_loss_pct=0.03, max_weekly_loss_pct=0.05, 
                  max_daily_trades=20, state_file="risk_state.json"):
         """
@@ -24,6 +47,11 @@ class RiskManager:
         self.max_weekly_loss_pct = max_weekly_loss_pct
         self.max_daily_trades = max_daily_trades
         self.state_file = state_file
+        self._dirty = False
+        self._last_flush = 0.0
+        self._acct_cache = (0.0, None)
+        # Local midnight before which no period can roll over (None = check now)
+        self._next_period_check = None
         
         # Load or initialize state
         self.state = self._load_state()
@@ -35,8 +63,8 @@ class RiskManager:
         """Load risk state from file or create new state."""
         if os.path.exists(self.state_file):
             try:
-                with open(self.state_file, 'r') as f:
-                    return json.load(f)
+                with open(self.state_file, 'rb') as f:
+                    return _load_state_file(f)
             except:
                 pass
         
@@ -54,28 +82,81 @@ class RiskManager:
             "lock_reason": None
         }
     
+    def _mark_dirty(self):
+        """Record a state change; it is written at most every FLUSH_INTERVAL seconds."""
+        self._dirty = True
+        self.flush_state()
+    
     def _save_state(self):
-        """Persist risk state to file."""
+        """Persist risk state immediately (period resets, lock transitions, trades)."""
+        self._dirty = True
+        self.flush_state(force=True)
+    
+    def flush_state(self, force=False):
+        """
+        Write pending state changes to file.
+        
+        The state is written to a temporary file and renamed over the old one,
+        so a crash mid-write never leaves a truncated risk_state.json behind.
+        
+        Args:
+            force: Write now instead of waiting for FLUSH_INTERVAL to elapse
+        """
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.FLUSH_INTERVAL:
+            return
+        
+        tmp_file = f"{self.state_file}.tmp"
         try:
-            with open(self.state_file, 'w') as f:
-                json.dump(self.state, f, indent=2)
+            with open(tmp_file, 'wb') as f:
+                _dump_state(self.state, f)
+            os.replace(tmp_file, self.state_file)
+            self._dirty = False
+            self._last_flush = now
         except Exception as e:
             print(f"⚠️  Failed to save risk state: {e}")
     
+    def _account_info(self):
+        """
+        mt5.account_info() memoized for ACCOUNT_INFO_TTL seconds, so the period
+        check, watermark update and limit checks of one tick share a single
+        terminal round trip.
+        """
+        fetched_at, account_info = self._acct_cache
+        now = time.monotonic()
+        if account_info is None or now - fetched_at >= self.ACCOUNT_INFO_TTL:
+            account_info = mt5.account_info()
+            self._acct_cache = (now, account_info)
+        return account_info
+    
+    def invalidate_account_cache(self):
+        """Force the next balance read to fetch fresh account info."""
+        self._acct_cache = (0.0, None)
+    
     def _check_and_reset_periods(self):
         """Check if daily/weekly periods have elapsed and reset counters."""
-        today = datetime.now().date().isoformat()
-        current_week = datetime.now().isocalendar()[1]  # Week number
+        # Periods only roll over at local midnight; until then there is nothing to do
+        now = datetime.now()
+        if self._next_period_check is not None and now < self._next_period_check:
+            return
+        
+        today = now.date().isoformat()
+        current_week = now.isocalendar()[1]  # Week number
+        
+        reset = False
         
         # Reset daily counters
         if self.state["daily_start_date"] != today:
-            account_info = mt5.account_info()
+            account_info = self._account_info()
             if account_info:
                 self.state["daily_start_balance"] = account_info.balance
                 self.state["daily_high_balance"] = account_info.balance
                 self.state["daily_start_date"] = today
                 self.state["daily_trades_count"] = 0
                 self.state["is_daily_locked"] = False
+                reset = True
                 print(f"📅 New trading day. Starting balance: ${account_info.balance:,.2f}")
         
         # Reset weekly counters (on Monday)
@@ -85,15 +166,23 @@ class RiskManager:
             stored_week = stored_date.isocalendar()[1]
         
         if stored_week != current_week:
-            account_info = mt5.account_info()
+            account_info = self._account_info()
             if account_info:
                 self.state["weekly_start_balance"] = account_info.balance
                 self.state["weekly_high_balance"] = account_info.balance
-                self.state["weekly_start_date"] = datetime.now().date().isoformat()
+                self.state["weekly_start_date"] = today
                 self.state["is_weekly_locked"] = False
+                stored_week = current_week
+                reset = True
                 print(f"📅 New trading week. Starting balance: ${account_info.balance:,.2f}")
         
-        self._save_state()
+        if reset:
+            self._save_state()
+        
+        # Skip the checks until the next midnight, unless a reset is still pending
+        # because account info was unavailable
+        if self.state["daily_start_date"] == today and stored_week == current_week:
+            self._next_period_check = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
     
     def can_trade(self):
         """
@@ -113,7 +202,7 @@ class RiskManager:
             return False, f"Weekly loss limit reached: {self.state['lock_reason']}"
         
         # Get current balance
-        account_info = mt5.account_info()
+        account_info = self._account_info()
         if not account_info:
             return False, "Cannot retrieve account info"
         
@@ -169,28 +258,46 @@ class RiskManager:
         
         return True, None
     
+    def seconds_until_reset(self):
+        """
+        Seconds until the next period rollover. Daily counters reset at local
+        midnight (and weekly ones at the midnight starting a new week), so that
+        is the next point at which a lock can lift.
+        """
+        now = datetime.now()
+        next_reset = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return (next_reset - now).total_seconds()
+    
     def record_trade(self):
         """Record that a trade was placed."""
         self.state["daily_trades_count"] += 1
         self._save_state()
+        self.invalidate_account_cache()
     
     def update_high_watermarks(self):
         """Update daily and weekly high balance watermarks."""
-        account_info = mt5.account_info()
+        account_info = self._account_info()
         if not account_info:
             return
         
         current_balance = account_info.balance
+        changed = False
         
         # Update daily high
         if not self.state["daily_high_balance"] or current_balance > self.state["daily_high_balance"]:
             self.state["daily_high_balance"] = current_balance
+            changed = True
         
         # Update weekly high
         if not self.state["weekly_high_balance"] or current_balance > self.state["weekly_high_balance"]:
             self.state["weekly_high_balance"] = current_balance
+            changed = True
         
-        self._save_state()
+        if changed:
+            self._mark_dirty()
+        else:
+            # Write out a watermark change that was held back by FLUSH_INTERVAL
+            self.flush_state()
     
     def get_risk_status(self):
         """
@@ -199,7 +306,7 @@ class RiskManager:
         Returns:
             Dictionary with risk metrics
         """
-        account_info = mt5.account_info()
+        account_info = self._account_info()
         if not account_info:
             return None
         
@@ -1,5 +1,9 @@
 import os
+import queue
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -26,25 +30,77 @@ class TelegramNotifier:
                 print("⚠️  Telegram credentials not found. Notifications disabled.")
                 print("   Set TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID in .env file")
                 self.enabled = False
+        
+        # Messages are sent by a background thread over one pooled HTTPS session,
+        # so notifying never blocks the trading loop on the network
+        # Bounded so a Telegram outage cannot grow the backlog without limit
+        self._queue = queue.Queue(maxsize=256)
+        self._session = requests.Session()
+        self._worker = None
+        if self.enabled:
+            self._url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
+            # Retry only failed connects: urllib3 never re-sends a POST whose
+            # request may have reached the server, so messages are not duplicated
+            adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4,
+                                  max_retries=Retry(total=2, backoff_factor=0.2))
+            self._session.mount("https://", adapter)
+            self._worker = threading.Thread(target=self._send_worker, name="telegram", daemon=True)
+            self._worker.start()
     
-    def send_message(self, message, parse_mode="HTML"):
-        """Send a message via Telegram."""
+    def send_message(self, message, parse_mode="HTML", wait=False):
+        """
+        Send a message via Telegram.
+        
+        By default the message is queued for the background sender and True is
+        returned right away; with wait=True it is sent inline and the result of
+        the request is returned.
+        """
         if not self.enabled:
             return False
         
+        if wait:
+            return self._post(message, parse_mode)
+        
+        try:
+            self._queue.put_nowait((message, parse_mode))
+        except queue.Full:
+            print("⚠️  Telegram queue full, dropping notification")
+            return False
+        return True
+    
+    def _post(self, message, parse_mode):
+        """POST one message to the Bot API; returns True on HTTP 200."""
         try:
-            url = f"https://api.telegram.org/bot{self.bot_token}/sendMessage"
             data = {
                 "chat_id": self.chat_id,
                 "text": message,
                 "parse_mode": parse_mode
             }
-            response = requests.post(url, data=data, timeout=10)
+            response = self._session.post(self._url, data=data, timeout=10)
             return response.status_code == 200
         except Exception as e:
             print(f"❌ Telegram notification failed: {e}")
             return False
     
+    def _send_worker(self):
+        """Sends queued messages in order until a None sentinel is received."""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._post(*item)
+    
+    def close(self, timeout=10):
+        """Send any messages still queued and stop the background sender."""
+        if self._worker is not None:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._worker.join(timeout=timeout)
+            self._worker = None
+        self._session.close()
+    
     def notify_bot_started(self, account_balance, symbol, risk_pct, settings):
         """Notify when bot starts."""
         message = f"""
@@ -231,7 +287,7 @@ Failed OB now acting as reversal zone!
             return False
         
         message = "✅ <b>Telegram Connection Test</b>\n\nBot is connected and ready to send notifications!"
-        success = self.send_message(message)
+        success = self.send_message(message, wait=True)
         
         if success:
             print("✅ Telegram test message sent successfully!")
@@ -1,7 +1,8 @@
+import csv
 import sqlite3
+import threading
 from datetime import datetime
 import json
-import pandas as pd
 from pathlib import Path
 
 class TradeLogger:
@@ -10,6 +11,60 @@ class TradeLogger:
     Tracks setup quality, outcomes, and performance metrics.
     """
     
+    # Fixed SQL text for the per-trade statements, so every call reuses the
+    # connection's prepared-statement cache instead of compiling new SQL
+    _SQL_INSERT_TRADE = '''
+        INSERT INTO trades (
+            ticket_number, symbol, direction, entry_price, stop_loss, take_profit, lot_size,
+            status, setup_score, quality_rating,
+            ob_present, fvg_present, confluence_pct, confluence_quality,
+            mtf_enabled, mtf_alignment_pct, mtf_strength,
+            bb_confluence, bb_quality,
+            risk_amount, risk_pct, risk_multiplier, rr_ratio,
+            atr_pips, volume_ratio, spread_pips,
+            signal_time, order_placed_time, created_at, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+    # Tables and indexes created by _create_tables
+    _SCHEMA_OBJECTS = {'trades', 'daily_performance', 'weekly_performance', 'idx_trades_closed_date'}
+    
+    _SQL_UPDATE_STATUS = "UPDATE trades SET status = ?, updated_at = ? WHERE ticket_number = ?"
+    _SQL_MARK_ACTIVE = ("UPDATE trades SET status = ?, updated_at = ?, order_filled_time = ? "
+                        "WHERE ticket_number = ?")
+    # pips (signed by outcome, in units of the ?6 pip size) and pnl_pct are derived
+    # from the stored entry price and risk in the same statement
+    _SQL_CLOSE_TRADE = '''
+        UPDATE trades SET
+            status = ?1, updated_at = ?2, order_closed_time = ?2,
+            exit_price = ?3, pnl = ?4, outcome = ?5,
+            pips = CASE WHEN ?5 = 'loss' THEN -(ABS(?3 - entry_price) / ?6)
+                        ELSE ABS(?3 - entry_price) / ?6 END,
+            pnl_pct = CASE WHEN risk_amount > 0 THEN ?4 / risk_amount * 100 ELSE 0 END
+        WHERE ticket_number = ?7
+    '''
+    # The same pips derivation over every closed trade of one symbol
+    _SQL_RECOMPUTE_PIPS = '''
+        UPDATE trades SET
+            pips = CASE WHEN outcome = 'loss' THEN -(ABS(exit_price - entry_price) / ?2)
+                        ELSE ABS(exit_price - entry_price) / ?2 END
+        WHERE symbol = ?1 AND status = 'closed' AND exit_price IS NOT NULL
+    '''
+    # Statistic name and its aggregate over the trades in a reporting window
+    _STATS_AGGREGATES = (
+        ('total_trades', "COUNT(CASE WHEN {in_window} THEN 1 END)"),
+        ('wins', "SUM(CASE WHEN {in_window} AND outcome = 'win' THEN 1 ELSE 0 END)"),
+        ('losses', "SUM(CASE WHEN {in_window} AND outcome = 'loss' THEN 1 ELSE 0 END)"),
+        ('total_pnl', "SUM(CASE WHEN {in_window} THEN pnl END)"),
+        ('avg_win', "AVG(CASE WHEN {in_window} AND outcome = 'win' THEN pnl END)"),
+        ('avg_loss', "AVG(CASE WHEN {in_window} AND outcome = 'loss' THEN pnl END)"),
+        ('best_trade', "MAX(CASE WHEN {in_window} THEN pnl END)"),
+        ('worst_trade', "MIN(CASE WHEN {in_window} THEN pnl END)"),
+        ('avg_setup_score', "AVG(CASE WHEN {in_window} THEN setup_score END)"),
+        ('avg_rr_ratio', "AVG(CASE WHEN {in_window} THEN rr_ratio END)"),
+        ('gross_profit', "SUM(CASE WHEN {in_window} AND outcome = 'win' THEN pnl END)"),
+        ('gross_loss', "SUM(CASE WHEN {in_window} AND outcome = 'loss' THEN pnl END)"),
+    )
+    
     def __init__(self, db_path="trades.db"):
         """
         Initialize Trade Logger.
@@ -18,15 +73,52 @@ class TradeLogger:
             db_path: Path to SQLite database file
         """
         self.db_path = db_path
+        # One long-lived connection shared by the trading, order-management and
+        # trade-log threads; the lock serializes its use
+        self._lock = threading.Lock()
+        self._conn = self._connect()
         self._create_tables()
     
+    def _connect(self):
+        """
+        Open the connection with the per-connection PRAGMAs applied.
+        
+        synchronous=NORMAL is safe under WAL (set once in _create_tables) and drops
+        the fsync per commit to checkpoints; busy_timeout lets a reader such as
+        view_stats.py and the bot's writer wait on each other instead of failing.
+        
+        The connection is in autocommit mode: each write here is a single statement
+        that SQLite commits (or rolls back) on its own, so the module's implicit
+        BEGIN and the separate COMMIT are not needed. Multi-statement writes open
+        their transaction explicitly with BEGIN IMMEDIATE.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256,
+                               isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA mmap_size=268435456")
+        conn.execute("PRAGMA cache_size=-65536")
+        conn.execute("PRAGMA busy_timeout=3000")
+        return conn
+    
     def _create_tables(self):
         """Create database tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        conn = self._conn
+        # WAL is persistent in the database file, so it only needs setting once;
+        # readers then never block the writer (and vice versa)
+        conn.execute("PRAGMA journal_mode=WAL")
+        
+        # Nothing to do (and no write lock to take) when the schema is already in place
+        existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        if self._SCHEMA_OBJECTS <= existing:
+            print(f"✅ Trade logging database initialized: {self.db_path}")
+            return
         
-        # Trades table
-        cursor.execute('''
+        # Otherwise create everything in one transaction, as a single script
+        conn.executescript('''
+            BEGIN IMMEDIATE;
+            
+            -- Trades table
             CREATE TABLE IF NOT EXISTS trades (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 ticket_number INTEGER UNIQUE NOT NULL,
@@ -84,11 +176,9 @@ class TradeLogger:
                 
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
-            )
-        ''')
-        
-        # Daily performance table
-        cursor.execute('''
+            );
+            
+            -- Daily performance table
             CREATE TABLE IF NOT EXISTS daily_performance (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 date TEXT UNIQUE NOT NULL,
@@ -110,11 +200,9 @@ class TradeLogger:
                 
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL
-            )
-        ''')
-        
-        # Weekly performance table
-        cursor.execute('''
+            );
+            
+            -- Weekly performance table
             CREATE TABLE IF NOT EXISTS weekly_performance (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
                 week_start_date TEXT NOT NULL,
@@ -132,11 +220,17 @@ class TradeLogger:
                 created_at TEXT NOT NULL,
                 updated_at TEXT NOT NULL,
                 UNIQUE(week_number, year)
-            )
+            );
+            
+            -- Closed trades by close date, for the daily and N-day reports. Indexing the
+            -- DATE() expression the queries filter on keeps them sargable without a
+            -- separate date column, and covers rows logged before the index existed
+            CREATE INDEX IF NOT EXISTS idx_trades_closed_date
+            ON trades(DATE(order_closed_time))
+            WHERE status = 'closed';
+            
+            COMMIT;
         ''')
-        
-        conn.commit()
-        conn.close()
         print(f"✅ Trade logging database initialized: {self.db_path}")
     
     def log_trade_signal(self, ticket_number, symbol, direction, entry_price, 
@@ -153,53 +247,40 @@ class TradeLogger:
         Returns:
             True if logged successfully
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        now = datetime.utcnow().isoformat()
-        
-        try:
-            cursor.execute('''
-                INSERT INTO trades (
+        with self._lock:
+            conn = self._conn
+            cursor = conn.cursor()
+            
+            now = datetime.utcnow().isoformat()
+            
+            try:
+                cursor.execute(self._SQL_INSERT_TRADE, (
                     ticket_number, symbol, direction, entry_price, stop_loss, take_profit, lot_size,
-                    status, setup_score, quality_rating,
-                    ob_present, fvg_present, confluence_pct, confluence_quality,
-                    mtf_enabled, mtf_alignment_pct, mtf_strength,
-                    bb_confluence, bb_quality,
+                    'pending', setup_analysis.get('score', 0), setup_analysis.get('quality', 'N/A'),
+                    setup_analysis.get('ob_present', False), setup_analysis.get('fvg_present', False),
+                    setup_analysis.get('confluence_pct', 0), setup_analysis.get('confluence_quality', None),
+                    mtf_alignment is not None, 
+                    mtf_alignment.get('alignment_pct', 0) if mtf_alignment else 0,
+                    mtf_alignment.get('strength', None) if mtf_alignment else None,
+                    bb_confluence is not None,
+                    bb_confluence.get('quality', None) if bb_confluence else None,
                     risk_amount, risk_pct, risk_multiplier, rr_ratio,
                     atr_pips, volume_ratio, spread_pips,
-                    signal_time, order_placed_time, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                ticket_number, symbol, direction, entry_price, stop_loss, take_profit, lot_size,
-                'pending', setup_analysis.get('score', 0), setup_analysis.get('quality', 'N/A'),
-                setup_analysis.get('ob_present', False), setup_analysis.get('fvg_present', False),
-                setup_analysis.get('confluence_pct', 0), setup_analysis.get('confluence_quality', None),
-                mtf_alignment is not None, 
-                mtf_alignment.get('alignment_pct', 0) if mtf_alignment else 0,
-                mtf_alignment.get('strength', None) if mtf_alignment else None,
-                bb_confluence is not None,
-                bb_confluence.get('quality', None) if bb_confluence else None,
-                risk_amount, risk_pct, risk_multiplier, rr_ratio,
-                atr_pips, volume_ratio, spread_pips,
-                now, now, now, now
-            ))
-            
-            conn.commit()
-            print(f"✅ Trade logged: Ticket #{ticket_number}")
-            return True
-            
-        except sqlite3.IntegrityError:
-            print(f"⚠️  Trade #{ticket_number} already exists in database")
-            return False
-        except Exception as e:
-            print(f"❌ Failed to log trade: {e}")
-            return False
-        finally:
-            conn.close()
+                    now, now, now, now
+                ))
+                
+                print(f"✅ Trade logged: Ticket #{ticket_number}")
+                return True
+                
+            except sqlite3.IntegrityError:
+                print(f"⚠️  Trade #{ticket_number} already exists in database")
+                return False
+            except Exception as e:
+                print(f"❌ Failed to log trade: {e}")
+                return False
     
     def update_trade_status(self, ticket_number, status, exit_price=None, 
-                           pnl=None, outcome=None):
+                           pnl=None, outcome=None, pip_size=0.0001):
         """
         Update trade status when filled, modified, or closed.
         
@@ -209,59 +290,62 @@ class TradeLogger:
             exit_price: Exit price if closed
             pnl: Profit/loss amount
             outcome: 'win', 'loss', 'breakeven'
+            pip_size: Price size of one pip for the trade's symbol (point * 10 on
+                5-digit brokers, e.g. 0.01 for JPY pairs)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        now = datetime.utcnow().isoformat()
-        
-        try:
-            # Build update query dynamically
-            updates = ["status = ?", "updated_at = ?"]
-            values = [status, now]
+        with self._lock:
+            conn = self._conn
+            cursor = conn.cursor()
             
-            if status == 'active':
-                updates.append("order_filled_time = ?")
-                values.append(now)
+            now = datetime.utcnow().isoformat()
             
-            if status == 'closed' and exit_price is not None:
-                updates.extend([
-                    "order_closed_time = ?",
-                    "exit_price = ?",
-                    "pnl = ?",
-                    "outcome = ?"
-                ])
-                values.extend([now, exit_price, pnl, outcome])
+            try:
+                if status == 'closed' and exit_price is not None:
+                    query = self._SQL_CLOSE_TRADE
+                    values = [status, now, exit_price, pnl, outcome, pip_size]
+                elif status == 'active':
+                    query = self._SQL_MARK_ACTIVE
+                    values = [status, now, now]
+                else:
+                    query = self._SQL_UPDATE_STATUS
+                    values = [status, now]
                 
-                # Calculate pips and pnl_pct
-                cursor.execute("SELECT entry_price, stop_loss, risk_amount FROM trades WHERE ticket_number = ?", 
-                             (ticket_number,))
-                result = cursor.fetchone()
-                if result:
-                    entry_price, stop_loss, risk_amount = result
-                    pips = abs(exit_price - entry_price) * 10000  # Forex calculation
-                    if outcome == 'loss':
-                        pips = -pips
-                    
-                    pnl_pct = (pnl / risk_amount * 100) if risk_amount > 0 else 0
-                    
-                    updates.extend(["pips = ?", "pnl_pct = ?"])
-                    values.extend([pips, pnl_pct])
-            
-            values.append(ticket_number)
-            
-            query = f"UPDATE trades SET {', '.join(updates)} WHERE ticket_number = ?"
-            cursor.execute(query, values)
-            
-            conn.commit()
-            print(f"✅ Trade #{ticket_number} updated: {status}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Failed to update trade: {e}")
-            return False
-        finally:
-            conn.close()
+                values.append(ticket_number)
+                cursor.execute(query, values)
+                
+                print(f"✅ Trade #{ticket_number} updated: {status}")
+                return True
+                
+            except Exception as e:
+                print(f"❌ Failed to update trade: {e}")
+                return False
+    
+    def recompute_pips(self, pip_sizes):
+        """
+        Recompute the stored pips of closed trades with per-symbol pip sizes, e.g.
+        to correct trades closed before the pip size was passed in.
+        
+        Args:
+            pip_sizes: Dictionary mapping symbol to its pip size in price units
+        
+        Returns:
+            Number of trades updated
+        """
+        with self._lock:
+            conn = self._conn
+            try:
+                # One statement per symbol, all applied in a single transaction
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.executemany(self._SQL_RECOMPUTE_PIPS, pip_sizes.items())
+                conn.execute("COMMIT")
+                print(f"✅ Pips recomputed for {cursor.rowcount} trades")
+                return cursor.rowcount
+                
+            except Exception as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                print(f"❌ Failed to recompute pips: {e}")
+                return 0
     
     def calculate_daily_performance(self, date=None):
         """
@@ -273,75 +357,91 @@ class TradeLogger:
         if date is None:
             date = datetime.now().date().isoformat()
         
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        try:
-            # Get all closed trades for the day
-            cursor.execute('''
-                SELECT pnl, outcome, risk_amount 
-                FROM trades 
-                WHERE DATE(order_closed_time) = ? AND status = 'closed'
-            ''', (date,))
-            
-            trades = cursor.fetchall()
-            
-            if not trades:
-                print(f"ℹ️  No closed trades for {date}")
-                return
-            
-            total_trades = len(trades)
-            winning_trades = sum(1 for t in trades if t[1] == 'win')
-            losing_trades = sum(1 for t in trades if t[1] == 'loss')
-            breakeven_trades = sum(1 for t in trades if t[1] == 'breakeven')
-            
-            total_pnl = sum(t[0] for t in trades)
-            win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
-            
-            wins = [t[0] for t in trades if t[1] == 'win']
-            losses = [t[0] for t in trades if t[1] == 'loss']
-            
-            avg_win = sum(wins) / len(wins) if wins else 0
-            avg_loss = sum(losses) / len(losses) if losses else 0
-            largest_win = max(wins) if wins else 0
-            largest_loss = min(losses) if losses else 0
-            
-            gross_profit = sum(wins) if wins else 0
-            gross_loss = abs(sum(losses)) if losses else 0
-            profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0
-            
-            # Get starting balance (would need to be tracked separately)
-            # For now, use a placeholder
-            starting_balance = 10000  # You'd get this from account history
-            ending_balance = starting_balance + total_pnl
-            total_pnl_pct = (total_pnl / starting_balance * 100) if starting_balance > 0 else 0
+        with self._lock:
+            conn = self._conn
+            cursor = conn.cursor()
             
-            now = datetime.utcnow().isoformat()
-            
-            # Insert or update daily performance
-            cursor.execute('''
-                INSERT OR REPLACE INTO daily_performance (
+            try:
+                # Nothing to recompute if no closed trade for the day has changed since
+                # the stored row was written (both timestamps are UTC ISO strings)
+                cursor.execute('''
+                    SELECT 1 FROM daily_performance
+                    WHERE date = ?1 AND updated_at > (
+                        SELECT MAX(updated_at) FROM trades
+                        WHERE DATE(order_closed_time) = ?1 AND status = 'closed'
+                    )
+                ''', (date,))
+                
+                if cursor.fetchone():
+                    print(f"ℹ️  Daily performance for {date} is up to date")
+                    return
+                
+                # Aggregate the day's closed trades in one scan
+                cursor.execute('''
+                    SELECT 
+                        COUNT(*),
+                        SUM(CASE WHEN outcome = 'win' THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN outcome = 'loss' THEN 1 ELSE 0 END),
+                        SUM(CASE WHEN outcome = 'breakeven' THEN 1 ELSE 0 END),
+                        TOTAL(pnl),
+                        AVG(CASE WHEN outcome = 'win' THEN pnl END),
+                        AVG(CASE WHEN outcome = 'loss' THEN pnl END),
+                        MAX(CASE WHEN outcome = 'win' THEN pnl END),
+                        MIN(CASE WHEN outcome = 'loss' THEN pnl END),
+                        TOTAL(CASE WHEN outcome = 'win' THEN pnl END),
+                        TOTAL(CASE WHEN outcome = 'loss' THEN pnl END)
+                    FROM trades 
+                    WHERE DATE(order_closed_time) = ? AND status = 'closed'
+                ''', (date,))
+                
+                (total_trades, winning_trades, losing_trades, breakeven_trades, total_pnl,
+                 avg_win, avg_loss, largest_win, largest_loss,
+                 gross_profit, loss_sum) = cursor.fetchone()
+                
+                if not total_trades:
+                    print(f"ℹ️  No closed trades for {date}")
+                    return
+                
+                win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+                
+                # AVG/MAX/MIN are NULL when there are no wins / losses
+                avg_win = avg_win or 0
+                avg_loss = avg_loss or 0
+                largest_win = largest_win or 0
+                largest_loss = largest_loss or 0
+                
+                gross_loss = abs(loss_sum)
+                profit_factor = (gross_profit / gross_loss) if gross_loss > 0 else 0
+                
+                # Get starting balance (would need to be tracked separately)
+                # For now, use a placeholder
+                starting_balance = 10000  # You'd get this from account history
+                ending_balance = starting_balance + total_pnl
+                total_pnl_pct = (total_pnl / starting_balance * 100) if starting_balance > 0 else 0
+                
+                now = datetime.utcnow().isoformat()
+                
+                # Insert or update daily performance
+                cursor.execute('''
+                    INSERT OR REPLACE INTO daily_performance (
+                        date, starting_balance, ending_balance,
+                        total_trades, winning_trades, losing_trades, breakeven_trades,
+                        total_pnl, total_pnl_pct, win_rate,
+                        avg_win, avg_loss, largest_win, largest_loss,
+                        profit_factor, created_at, updated_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
                     date, starting_balance, ending_balance,
                     total_trades, winning_trades, losing_trades, breakeven_trades,
                     total_pnl, total_pnl_pct, win_rate,
                     avg_win, avg_loss, largest_win, largest_loss,
-                    profit_factor, created_at, updated_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                date, starting_balance, ending_balance,
-                total_trades, winning_trades, losing_trades, breakeven_trades,
-                total_pnl, total_pnl_pct, win_rate,
-                avg_win, avg_loss, largest_win, largest_loss,
-                profit_factor, now, now
-            ))
-            
-            conn.commit()
-            print(f"✅ Daily performance calculated for {date}")
-            
-        except Exception as e:
-            print(f"❌ Failed to calculate daily performance: {e}")
-        finally:
-            conn.close()
+                    profit_factor, now, now
+                ))
+                
+                print(f"✅ Daily performance calculated for {date}")
+                
+            except Exception as e:
+                print(f"❌ Failed to calculate daily performance: {e}")
     
     def get_trade_statistics(self, days=30):
         """
@@ -350,60 +450,85 @@ class TradeLogger:
         Returns:
             Dictionary with all statistics
         """
-        conn = sqlite3.connect(self.db_path)
+        return self.get_trade_statistics_multi((days,))[days]
+    
+    def get_trade_statistics_multi(self, windows=(7, 30)):
+        """
+        Get trade statistics for several day windows in one pass over the trades.
         
+        Args:
+            windows: Day counts to report on, e.g. (7, 30)
+        
+        Returns:
+            Dictionary mapping each window to its statistics dictionary
+        """
+        windows = sorted(set(windows))
+        # Each window is a set of conditional aggregates over the same scan; ?N is
+        # that window's DATE('now', ?N) modifier, and the widest one bounds the scan
+        select_list = ',\n'.join(
+            template.format(in_window=f"DATE(order_closed_time) >= DATE('now', ?{n})") + f" AS {name}_{n}"
+            for n in range(1, len(windows) + 1)
+            for name, template in self._STATS_AGGREGATES
+        )
         query = f'''
-            SELECT 
-                COUNT(*) as total_trades,
-                SUM(CASE WHEN outcome = 'win' THEN 1 ELSE 0 END) as wins,
-                SUM(CASE WHEN outcome = 'loss' THEN 1 ELSE 0 END) as losses,
-                SUM(pnl) as total_pnl,
-                AVG(CASE WHEN outcome = 'win' THEN pnl END) as avg_win,
-                AVG(CASE WHEN outcome = 'loss' THEN pnl END) as avg_loss,
-                MAX(pnl) as best_trade,
-                MIN(pnl) as worst_trade,
-                AVG(setup_score) as avg_setup_score,
-                AVG(rr_ratio) as avg_rr_ratio
+            SELECT
+                {select_list}
             FROM trades
             WHERE status = 'closed' 
-            AND DATE(order_closed_time) >= DATE('now', '-{days} days')
+            AND DATE(order_closed_time) >= DATE('now', ?{len(windows)})
         '''
         
-        df = pd.read_sql_query(query, conn)
-        conn.close()
+        with self._lock:
+            cursor = self._conn.execute(query, [f"-{days} days" for days in windows])
+            row = cursor.fetchone()
         
-        stats = df.iloc[0].to_dict()
-
-        # Handle None values from SQL (when no trades exist)
-        numeric_fields = ['wins', 'losses', 'total_pnl', 'avg_win', 'avg_loss',
-                         'best_trade', 'worst_trade', 'avg_setup_score', 'avg_rr_ratio']
-        for field in numeric_fields:
-            if stats[field] is None:
-                stats[field] = 0
-
-        if stats['total_trades'] > 0:
-            stats['win_rate'] = (stats['wins'] / stats['total_trades'] * 100)
-            gross_profit = stats['wins'] * stats['avg_win'] if stats['avg_win'] else 0
-            gross_loss = abs(stats['losses'] * stats['avg_loss']) if stats['avg_loss'] else 0
-            stats['profit_factor'] = (gross_profit / gross_loss) if gross_loss > 0 else 0
-        else:
-            stats['win_rate'] = 0
-            stats['profit_factor'] = 0
+        results = {}
+        values = iter(row)
+        for days in windows:
+            # Aggregates are NULL when no trades exist
+            stats = {}
+            for name, _ in self._STATS_AGGREGATES:
+                value = next(values)
+                stats[name] = 0 if value is None else value
+            
+            if stats['total_trades'] > 0:
+                stats['win_rate'] = (stats['wins'] / stats['total_trades'] * 100)
+                gross_loss = abs(stats['gross_loss'])
+                stats['profit_factor'] = (stats['gross_profit'] / gross_loss) if gross_loss > 0 else 0
+            else:
+                stats['win_rate'] = 0
+                stats['profit_factor'] = 0
+            
+            results[days] = stats
         
-        return stats
+        return results
     
     def export_to_csv(self, filename="trades_export.csv"):
         """Export all trades to CSV for external analysis."""
-        conn = sqlite3.connect(self.db_path)
-        df = pd.read_sql_query("SELECT * FROM trades ORDER BY created_at DESC", conn)
-        conn.close()
+        # Rows are streamed from the cursor straight to the file, one at a time
+        with self._lock, open(filename, 'w', newline='') as f:
+            cursor = self._conn.execute("SELECT * FROM trades ORDER BY created_at DESC")
+            writer = csv.writer(f)
+            writer.writerow([column[0] for column in cursor.description])
+            writer.writerows(cursor)
         
-        df.to_csv(filename, index=False)
         print(f"✅ Trades exported to {filename}")
     
-    def print_performance_report(self, days=7):
-        """Print a formatted performance report."""
-        stats = self.get_trade_statistics(days)
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+    
+    def print_performance_report(self, days=7, stats=None):
+        """
+        Print a formatted performance report.
+        
+        Args:
+            days: Size of the reporting window in days
+            stats: Statistics for that window, if already fetched
+        """
+        if stats is None:
+            stats = self.get_trade_statistics(days)
         
         print(f"\n{'='*60}")
         print(f"📊 TRADING PERFORMANCE REPORT (Last {days} Days)")
@@ -1,10 +1,15 @@
 import MetaTrader5 as mt5
 import os
+from collections import namedtuple
 from dotenv import load_dotenv
-from config import MAX_SPREAD_PIPS
+from config import CFG
 
 load_dotenv()
 
+# symbol_info fields that never change during a session
+SymbolStatic = namedtuple("SymbolStatic", "point volume_min volume_max volume_step")
+_SYMBOL_STATIC = {}
+
 def mt5_connect():
     """Initializes connection to the MetaTrader 5 terminal."""
     mt5_account = int(os.getenv("MT5_ACCOUNT"))
@@ -20,17 +25,53 @@ def verify_demo_account():
     if account_info.trade_mode != mt5.ACCOUNT_TRADE_MODE_DEMO:
         raise Exception("This bot is intended to run on a demo account only.")
 
+def get_symbol_static(symbol):
+    """
+    Returns the session-constant symbol fields, fetched with one symbol_info call
+    the first time and cached afterwards. None (not cached) if the call fails.
+    """
+    static = _SYMBOL_STATIC.get(symbol)
+    if static is None:
+        symbol_info = mt5.symbol_info(symbol)
+        if symbol_info is None:
+            return None
+        static = SymbolStatic(symbol_info.point, symbol_info.volume_min,
+                              symbol_info.volume_max, symbol_info.volume_step)
+        _SYMBOL_STATIC[symbol] = static
+    return static
+
+def invalidate_symbol_cache():
+    """Drops the cached symbol fields, e.g. after reconnecting to another server."""
+    _SYMBOL_STATIC.clear()
+
 def check_spread(symbol):
     """Checks if the current spread is within the acceptable range."""
-    symbol_info = mt5.symbol_info(symbol)
-    tick = mt5.symbol_info_tick(symbol)
+    static = get_symbol_static(symbol)
+    if static is None:
+        return False
+
+    return is_spread_ok(mt5.symbol_info_tick(symbol), static.point)
 
-    if symbol_info is None or tick is None:
+def is_spread_ok(tick, point):
+    """Checks an already fetched tick's spread, given the symbol's point size."""
+    if tick is None:
         return False
 
-    pip_value = symbol_info.point * 10  # For 5-digit brokers, 1 pip = 10 points
+    pip_value = point * 10  # For 5-digit brokers, 1 pip = 10 points
     spread = (tick.ask - tick.bid) / pip_value
-    return spread <= MAX_SPREAD_PIPS
+    return spread <= CFG.MAX_SPREAD_PIPS
+
+def get_trading_snapshot(symbol):
+    """
+    Fetches the open positions, pending orders and last tick for a symbol together,
+    so the per-candle filters don't each make their own terminal calls.
+    Positions and orders are None when the terminal call failed, so callers
+    can tell a failed read apart from an empty one.
+    """
+    positions = mt5.positions_get(symbol=symbol)
+    orders = mt5.orders_get(symbol=symbol)
+    tick = mt5.symbol_info_tick(symbol)
+    return positions, orders, tick
 
 def calculate_lot_size(account_balance, risk_per_trade, stop_loss_pips, symbol):
     """Calculates the lot size based on risk percentage and stop loss distance in pips."""
@@ -54,9 +95,10 @@ def calculate_lot_size(account_balance, risk_per_trade, stop_loss_pips, symbol):
     lot_size = max(volume_min, lot_size)
     lot_size = min(volume_max, lot_size)
     
-    lot_size = round(lot_size / volume_step) * volume_step
-    
-    return round(lot_size, 2)
+    # Whole number of volume steps; the final round only strips float noise
+    # (0.1 * 3 -> 0.3) without assuming the step has two decimals
+    steps = int(round(lot_size / volume_step))
+    return round(steps * volume_step, 8)
 
 def execute_limit_order(order_type, symbol, lot_size, price, sl, tp, magic_number):
     """Executes a limit order on the MT5 terminal."""
@@ -79,5 +121,8 @@ def execute_limit_order(order_type, symbol, lot_size, price, sl, tp, magic_numbe
 
 def is_position_open(symbol):
     """Checks if there is an open position for a given symbol."""
-    positions = mt5.positions_get(symbol=symbol)
-    return len(positions) > 0
+    # positions_total() is a bare count; only fetch the position tuples when the
+    # account has any positions at all
+    if mt5.positions_total() == 0:
+        return False
+    return bool(mt5.positions_get(symbol=symbol))
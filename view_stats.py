@@ -2,11 +2,10 @@ from trade_logger import TradeLogger
 
 logger = TradeLogger()
 
-# Last 7 days performance
-logger.print_performance_report(days=7)
-
-# Last 30 days performance
-logger.print_performance_report(days=30)
+# Last 7 and 30 days performance, from a single query
+stats = logger.get_trade_statistics_multi(windows=(7, 30))
+logger.print_performance_report(days=7, stats=stats[7])
+logger.print_performance_report(days=30, stats=stats[30])
 
 # Export to CSV for Excel analysis
 logger.export_to_csv("trades_export.csv")